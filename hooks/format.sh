@@ -1,29 +1,225 @@
 #!/bin/bash
 # Post-tool hook: auto-format files after Write/Edit
+#
+# The hook only queues the file and returns. A single background worker waits
+# until edits have been quiet for FORMAT_DEBOUNCE seconds, then drains the
+# queue and runs each formatter once per project over the deduplicated files
+# for its language. Formatter output goes to format.log in the queue dir.
+#
+# Files are never formatted in place. Each one is snapshotted when its batch
+# starts and the formatters write their result to stdout, reading under the
+# file's real path (so project configs, tsconfig and imports all apply). The
+# result replaces the file only if it still matches its snapshot, so an
+# Edit/Write that lands while the formatters run is never overwritten.
+QUEUE_DIR="$HOME/.claude/hooks/format-queue"
+QUEUE="$QUEUE_DIR/queue"
+LOCK="$QUEUE_DIR/worker.lock"
+LOG="$QUEUE_DIR/format.log"
+DEBOUNCE="${FORMAT_DEBOUNCE:-0.5}"
+
+# Start a worker unless one is running; a lock whose worker died is taken over
+start_worker() {
+    if ! mkdir "$LOCK" 2>/dev/null; then
+        local pid
+        pid=$(cat "$LOCK/pid" 2>/dev/null)
+        if [ -n "$pid" ]; then
+            kill -0 "$pid" 2>/dev/null && return
+        elif [ -z "$(find "$LOCK" -maxdepth 0 -mmin +1 2>/dev/null)" ]; then
+            # Another hook is starting the worker right now
+            return
+        fi
+        rm -rf "$LOCK"
+        mkdir "$LOCK" 2>/dev/null || return
+    fi
+    nohup "$0" --worker </dev/null >>"$LOG" 2>&1 &
+    echo $! > "$LOCK/pid"
+}
+
+# Wait until the queue stops growing
+wait_for_quiet() {
+    local size=-1 current
+    while true; do
+        current=0
+        [ -f "$QUEUE" ] && current=$(wc -c < "$QUEUE" | tr -d ' ')
+        [ "$current" = "$size" ] && return
+        size="$current"
+        sleep "$DEBOUNCE"
+    done
+}
+
+# Run one formatter step on file $1's latest output: the rest of the command
+# reads it on stdin and writes the result to stdout. A failed step changes nothing.
+pipe_step() {
+    local i="$1" out="$work_dir/$1.$((++steps))"
+    shift
+    "$@" < "${current[$i]}" > "$out" || return
+    current[$i]="$out"
+}
+
+format_go() {
+    local i file copy dir="" batch=() copies=()
+    echo "Hook: running gofmt + golangci-lint on ${#go_idx[@]} files"
+    for i in "${go_idx[@]}"; do
+        pipe_step "$i" gofmt
+    done
+    # golangci-lint can only fix files in place, so it runs on copies next to
+    # each file (same package, build-tag and _test suffixes), one dir per run
+    for i in "${go_idx[@]}"; do
+        file="${files[$i]}"
+        copy="$(dirname "$file")/format$$_$(basename "$file")"
+        cp "${current[$i]}" "$copy" || continue
+        go_copies+=("$copy")
+        if [ -n "$dir" ] && [ "$(dirname "$file")" != "$dir" ]; then
+            golangci-lint run --fix "${batch[@]}"
+            batch=()
+        fi
+        dir=$(dirname "$file")
+        batch+=("$copy")
+        copies[$i]="$copy"
+    done
+    [ ${#batch[@]} -gt 0 ] && golangci-lint run --fix "${batch[@]}"
+    for i in "${!copies[@]}"; do
+        current[$i]="${copies[$i]}"
+    done
+}
+
+# One eslint run over the real paths; --fix-dry-run reports each fixed file's
+# output in the JSON results instead of writing it
+format_ts() {
+    local i eslint=(npx eslint) results="$work_dir/eslint.json" paths=()
+    command -v eslint_d >/dev/null 2>&1 && eslint=(eslint_d)
+    echo "Hook: running ${eslint[*]} --fix on ${#ts_idx[@]} files"
+    for i in "${ts_idx[@]}"; do
+        paths+=("${files[$i]}")
+    done
+    "${eslint[@]}" --fix-dry-run --format json "${paths[@]}" > "$results"
+    for i in "${ts_idx[@]}"; do
+        pipe_step "$i" jq -je --arg path "${files[$i]}" \
+            '.[] | select(.filePath == $path and .output) | .output' "$results"
+    done
+}
+
+# Snapshot a file and sort it by language
+stage_file() {
+    local file="$1" i=${#files[@]}
+    case "$file" in
+        /*) ;;
+        *) file="$PWD/$file" ;;
+    esac
+    cp "$file" "$work_dir/$i" || return
+    files[$i]="$file"
+    current[$i]="$work_dir/$i"
+    sums[$i]="$(cksum < "$work_dir/$i")"
+    case "$file" in
+        *.go) go_idx+=("$i") ;;
+        *.ex|*.exs) ex_idx+=("$i") ;;
+        *.ts|*.tsx) ts_idx+=("$i") ;;
+        *.py) py_idx+=("$i") ;;
+        *.rb) rb_idx+=("$i") ;;
+    esac
+}
+
+# Write each formatted result over its file, unless the file changed meanwhile
+commit_formatted() {
+    local i file tmp
+    for i in "${!files[@]}"; do
+        file="${files[$i]}"
+        cmp -s "${current[$i]}" "$file" && continue
+        if [ "$(cksum < "$file" 2>/dev/null)" != "${sums[$i]}" ]; then
+            # The edit that changed it queued the file again
+            echo "Hook: $file changed while formatting, keeping the edit"
+            continue
+        fi
+        # Swap in a temp file with the same mode, so readers never see a partial write
+        tmp="$(dirname "$file")/.$(basename "$file").format$$"
+        cp -p "$file" "$tmp" && cat "${current[$i]}" > "$tmp" && mv -f "$tmp" "$file"
+    done
+}
+
+# Run each language's formatter once over the files queued from one project dir
+flush_project() {
+    [ -n "$project_dir" ] && [ ${#queued[@]} -gt 0 ] || return
+    (
+        cd "$project_dir" || exit
+        local file i steps=0 work_dir files=() current=() sums=() go_copies=()
+        local go_idx=() ex_idx=() ts_idx=() py_idx=() rb_idx=()
+        work_dir=$(mktemp -d) || exit
+        trap 'rm -rf "$work_dir" "${go_copies[@]}"' EXIT
+        for file in "${queued[@]}"; do
+            [ -f "$file" ] && stage_file "$file"
+        done
+        echo "$(date): formatting in $project_dir"
+        [ ${#go_idx[@]} -gt 0 ] && format_go
+        if [ ${#ex_idx[@]} -gt 0 ]; then
+            echo "Hook: running mix format on ${#ex_idx[@]} files"
+            for i in "${ex_idx[@]}"; do
+                pipe_step "$i" mix format --stdin-filename "${files[$i]}" -
+            done
+        fi
+        [ ${#ts_idx[@]} -gt 0 ] && format_ts
+        if [ ${#py_idx[@]} -gt 0 ]; then
+            echo "Hook: running ruff format + check on ${#py_idx[@]} files"
+            for i in "${py_idx[@]}"; do
+                pipe_step "$i" ruff format --stdin-filename "${files[$i]}" &&
+                    pipe_step "$i" ruff check --fix --exit-zero --stdin-filename "${files[$i]}" -
+            done
+        fi
+        if [ ${#rb_idx[@]} -gt 0 ]; then
+            echo "Hook: running rubocop on ${#rb_idx[@]} files"
+            for i in "${rb_idx[@]}"; do
+                # --stderr keeps the report out of the corrected source on stdout
+                pipe_step "$i" rubocop -a --stderr --fail-level fatal --stdin "${files[$i]}"
+            done
+        fi
+        commit_formatted
+    )
+    queued=()
+}
+
+format_batch() {
+    local dir file
+    project_dir=""
+    queued=()
+    # Sorting groups entries by project and drops duplicate edits of a file
+    while IFS=$'\t' read -r dir file; do
+        if [ "$dir" != "$project_dir" ]; then
+            flush_project
+            project_dir="$dir"
+        fi
+        queued+=("$file")
+    done < <(sort -u "$1")
+    flush_project
+}
+
+run_worker() {
+    local batch="$QUEUE_DIR/batch.$$"
+    while true; do
+        wait_for_quiet
+        if [ ! -s "$QUEUE" ]; then
+            rm -rf "$LOCK"
+            # A file queued just before the lock was released would otherwise wait for the next edit
+            [ -s "$QUEUE" ] && mkdir "$LOCK" 2>/dev/null && echo $$ > "$LOCK/pid" && continue
+            exit 0
+        fi
+        mv "$QUEUE" "$batch"
+        format_batch "$batch"
+        rm -f "$batch"
+    done
+}
+
+if [ "$1" = "--worker" ]; then
+    run_worker
+fi
+
 FILE=$(jq -r '.tool_input.file_path // empty')
 echo "$(date): Hook triggered, FILE='$FILE'" >> ~/.claude/hooks/debug.log
 [[ -z "$FILE" || ! -f "$FILE" ]] && exit 0
 
 case "$FILE" in
-  *.go)
-    echo "Hook: running gofmt + golangci-lint on $FILE"
-    gofmt -w "$FILE" && golangci-lint run --fix "$FILE"
-    ;;
-  *.ex|*.exs)
-    echo "Hook: running mix format on $FILE"
-    mix format "$FILE"
-    ;;
-  *.ts|*.tsx)
-    echo "Hook: running eslint --fix on $FILE"
-    npx eslint --fix "$FILE"
-    ;;
-  *.py)
-    echo "Hook: running ruff format + check on $FILE"
-    ruff format "$FILE" && ruff check --fix "$FILE"
-    ;;
-  *.rb)
-    echo "Hook: running rubocop on $FILE"
-    rubocop -a "$FILE"
+  *.go|*.ex|*.exs|*.ts|*.tsx|*.py|*.rb)
+    mkdir -p "$QUEUE_DIR"
+    printf '%s\t%s\n' "$PWD" "$FILE" >> "$QUEUE"
+    start_worker
     ;;
 esac
 exit 0
@@ -0,0 +1,136 @@
+"""
+Append-only JSONL transcript of an agent batch session.
+
+run_agent.py writes one event per line as messages stream in, flushing each
+one, so nothing is held in memory and a crash or timeout keeps everything up
+to the last message. Event types:
+
+- start:    a fresh session began (batch, files, started_at)
+- session:  the SDK session ID, needed to resume
+- resume:   an interrupted session was picked up again
+- text:     assistant text
+- tool_use: a tool call (id, name, input)
+- tool_result: the result of a tool call came back (tool_use_id, is_error)
+- result:   the session finished (duration_ms, total_cost_usd, is_error, ...)
+- error:    the stream raised before a result arrived
+
+Every event carries `elapsed_ms` since the current session was (re)started.
+A log with no result event after its last start belongs to an interrupted
+batch; `finalize` builds the batch_result JSON summary from a log.
+"""
+
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterator
+
+
+def log_path(output_dir: Path, batch_num: int) -> Path:
+    return output_dir / f"batch_{batch_num:02d}.jsonl"
+
+
+class BatchLog:
+    """Appends events to a batch's JSONL log, one flushed line per event."""
+
+    def __init__(self, path: Path, fresh: bool = False):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        if not fresh and path.exists():
+            _drop_torn_line(path)
+        self._file = path.open("wb" if fresh else "ab")
+        self._started = time.monotonic()
+
+    def write(self, event_type: str, **fields: Any) -> None:
+        event = {"type": event_type, "elapsed_ms": round((time.monotonic() - self._started) * 1000), **fields}
+        self._file.write((json.dumps(event, ensure_ascii=False, default=str) + "\n").encode("utf-8"))
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "BatchLog":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def _drop_torn_line(path: Path) -> None:
+    """Truncate a half-written last line left by a killed run."""
+    with path.open("r+b") as f:
+        size = f.seek(0, os.SEEK_END)
+        if size == 0:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return
+        # Walk back to the last complete line
+        position = size
+        while position > 0:
+            step = min(4096, position)
+            position -= step
+            f.seek(position)
+            newline = f.read(step).rfind(b"\n")
+            if newline != -1:
+                f.truncate(position + newline + 1)
+                return
+        f.truncate(0)
+
+
+def read_events(path: Path) -> Iterator[dict]:
+    """Yields each complete event in the log; a torn last line is ignored."""
+    with path.open("rb") as f:
+        for line in f:
+            if line.endswith(b"\n"):
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    pass
+
+
+@dataclass
+class LogState:
+    files: list[str] | None = None
+    complete: bool = False
+    # Set while the last session can be resumed
+    session_id: str | None = None
+    resumed: bool = False
+
+
+def log_state(path: Path) -> LogState:
+    """Whether the log's last session finished, and the SDK session ID to resume it with."""
+    state = LogState()
+    if not path.exists():
+        return state
+    for event in read_events(path):
+        if event["type"] == "start":
+            state = LogState(files=event["files"])
+        elif event["type"] == "session":
+            state.session_id = event["session_id"]
+        elif event["type"] == "resume":
+            state.resumed = True
+        elif event["type"] == "result":
+            state.complete = True
+        elif event["type"] == "error" and state.resumed:
+            # Resuming did not work either; start over next time
+            state.session_id = None
+    return state
+
+
+def finalize(path: Path) -> dict:
+    """Builds the batch_result summary from the last session in a log.
+
+    Text from every part of an interrupted-and-resumed session is kept, in order.
+    """
+    summary = {}
+    output: list[str] = []
+    for event in read_events(path):
+        if event["type"] == "start":
+            summary = {"batch": event["batch"], "files_processed": len(event["files"]), "files": event["files"]}
+            output = []
+        elif event["type"] == "text":
+            output.append(event["text"])
+    summary["output"] = "\n".join(output)
+    return summary
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Per-session telemetry for run_agent.py, and a report comparing prompt files.
+
+`session_metrics` derives, from a batch's JSONL log (see agent_log.py), the
+time to first assistant message, each tool's call count and latency (from
+its tool_use to the matching tool_result), and the session's duration and
+cost. run_agent.py stores these with every session in
+.github/new_owner/runs.jsonl.
+
+The report groups successful sessions by prompt file and compares their
+throughput (files/second, files/hour) and cost (cost/file, files/dollar).
+
+Usage: python agent_metrics.py [--run-log FILE] [--prompt NAME ...]
+
+Example:
+    python agent_metrics.py --prompt codeowners-test-verifier.md --prompt codeowners-code-verifier.md
+"""
+import argparse
+import statistics
+from collections import defaultdict
+from pathlib import Path
+
+from agent_log import read_events
+from shard_batches import RUN_LOG, load_runs
+
+SESSION_EVENTS = ("start", "resume")
+
+
+def session_metrics(path: Path) -> dict:
+    """Telemetry for the last session (fresh or resumed) in a batch log."""
+    ttft_ms = None
+    tools: dict[str, list[int]] = {}
+    calls: dict[str, tuple[str, int]] = {}
+    for event in read_events(path):
+        event_type = event["type"]
+        if event_type in SESSION_EVENTS:
+            ttft_ms, tools, calls = None, {}, {}
+        elif event_type in ("text", "tool_use") and ttft_ms is None:
+            ttft_ms = event["elapsed_ms"]
+        if event_type == "tool_use":
+            calls[event["id"]] = (event["name"], event["elapsed_ms"])
+            tools.setdefault(event["name"], [])
+        elif event_type == "tool_result" and event["tool_use_id"] in calls:
+            name, started_ms = calls.pop(event["tool_use_id"])
+            tools[name].append(event["elapsed_ms"] - started_ms)
+
+    # Calls still open when the session ended count, but have no latency
+    counts = {name: len(latencies) for name, latencies in tools.items()}
+    for name, _ in calls.values():
+        counts[name] += 1
+    return {
+        "ttft_ms": ttft_ms,
+        "tools": {
+            name: {
+                "count": counts[name],
+                "timed": len(latencies),
+                "total_ms": sum(latencies),
+                "max_ms": max(latencies, default=0),
+            }
+            for name, latencies in sorted(tools.items())
+        },
+    }
+
+
+def _median(values: list[float]) -> float | None:
+    return statistics.median(values) if values else None
+
+
+def _format_ms(ms: float | None) -> str:
+    if ms is None:
+        return "-"
+    return f"{ms / 1000:.1f}s" if ms >= 1000 else f"{ms:.0f}ms"
+
+
+def print_report(runs: list[dict], prompts: list[str] | None = None) -> None:
+    by_prompt: dict[str, list[dict]] = defaultdict(list)
+    for run in runs:
+        # Sessions without files have no per-file figures to contribute
+        if run.get("status") == "done" and run.get("duration_ms") and run.get("prompt") and run.get("files"):
+            if not prompts or run["prompt"] in prompts:
+                by_prompt[run["prompt"]].append(run)
+
+    if not by_prompt:
+        print("No finished sessions with telemetry in the run log.")
+        return
+
+    print(f"{'Prompt':<36} {'Batches':>7} {'Files':>6} {'Files/s':>8} {'Files/h':>8} "
+          f"{'$/file':>8} {'Files/$':>8} {'TTFT p50':>9}")
+    for prompt, sessions in sorted(by_prompt.items()):
+        files = sum(len(s["files"]) for s in sessions)
+        seconds = sum(s["duration_ms"] for s in sessions) / 1000
+        cost = sum(s.get("total_cost_usd") or 0 for s in sessions)
+        ttft = _median([s["ttft_ms"] for s in sessions if s.get("ttft_ms") is not None])
+        per_file = f"${cost / files:.4f}"
+        per_dollar = f"{files / cost:.1f}" if cost else "-"
+        print(f"{prompt[:36]:<36} {len(sessions):>7} {files:>6} {files / seconds:>8.3f} "
+              f"{files / seconds * 3600:>8.0f} {per_file:>8} {per_dollar:>8} {_format_ms(ttft):>9}")
+
+    print(f"\n{'Prompt':<36} {'Tool':<10} {'Calls':>6} {'Per file':>8} {'Mean':>8} {'Max':>8}")
+    for prompt, sessions in sorted(by_prompt.items()):
+        files = sum(len(s["files"]) for s in sessions)
+        totals: dict[str, dict[str, int]] = defaultdict(lambda: {"count": 0, "timed": 0, "total_ms": 0, "max_ms": 0})
+        for session in sessions:
+            for name, tool in (session.get("tools") or {}).items():
+                totals[name]["count"] += tool["count"]
+                # Entries recorded before "timed" was tracked fall back to the call count
+                totals[name]["timed"] += tool.get("timed", tool["count"])
+                totals[name]["total_ms"] += tool["total_ms"]
+                totals[name]["max_ms"] = max(totals[name]["max_ms"], tool["max_ms"])
+        for name, tool in sorted(totals.items(), key=lambda item: -item[1]["count"]):
+            # Calls left open by an interrupted session have no latency to average
+            mean = tool["total_ms"] / tool["timed"] if tool["timed"] else None
+            print(f"{prompt[:36]:<36} {name:<10} {tool['count']:>6} {tool['count'] / files:>8.1f} "
+                  f"{_format_ms(mean):>8} {_format_ms(tool['max_ms']):>8}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare prompt files by throughput and cost per file.")
+    parser.add_argument("--run-log", type=Path, default=RUN_LOG, help=f"session history (default: {RUN_LOG})")
+    parser.add_argument(
+        "--prompt", action="append",
+        help="only include this prompt file name (repeatable; default: all)",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    print_report(load_runs(args.run_log), args.prompt)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Append-only history of Slack project channel audits, and queries over it.
+
+Every auditor run adds one small row per channel to a SQLite time series
+(`audit_history.sqlite` next to the reports), keyed by channel ID and run and
+indexed by run date. Trend and dormancy-transition questions are then
+answered from those indexes, reading only the runs and channels asked about,
+instead of by loading every timestamped `project_channels_*.json` snapshot.
+
+Older snapshots can be backfilled with `import`. Their last activity is only
+recorded as "N days ago", so imported last-message times are accurate to a day.
+
+Usage:
+    python audit_history.py import ../tmp_output/project_channels_*.json
+    python audit_history.py runs
+    python audit_history.py transitions --since 2026-07-01
+    python audit_history.py trend proj-payments
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+from datetime import datetime
+
+OUTPUT_DIR = '../tmp_output'
+HISTORY_DB_NAME = 'audit_history.sqlite'
+HISTORY_DB_FILE = os.path.join(OUTPUT_DIR, HISTORY_DB_NAME)
+
+# Run IDs are the report timestamp, e.g. project_channels_20261018_193000.json
+RUN_ID_FORMAT = '%Y%m%d_%H%M%S'
+SNAPSHOT_FILE_PATTERN = re.compile(r'project_channels_(\d{8}_\d{6})\.(?:json|ndjson)$')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id   TEXT PRIMARY KEY,
+    run_at   REAL NOT NULL,
+    source   TEXT NOT NULL,
+    -- Filled in when the run finishes
+    channels INTEGER,
+    active   INTEGER,
+    dormant  INTEGER
+);
+CREATE INDEX IF NOT EXISTS runs_by_date ON runs (run_at);
+CREATE TABLE IF NOT EXISTS snapshots (
+    channel_id    TEXT NOT NULL,
+    run_id        TEXT NOT NULL,
+    run_at        REAL NOT NULL,
+    name          TEXT NOT NULL,
+    last_ts       REAL,
+    is_dormant    INTEGER,
+    members_count INTEGER,
+    bot_is_member INTEGER,
+    -- The channel's previous known dormancy, so transitions need no scan
+    was_dormant     INTEGER,
+    previous_run_id TEXT,
+    PRIMARY KEY (channel_id, run_at)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS snapshots_by_run ON snapshots (run_at, channel_id);
+CREATE INDEX IF NOT EXISTS snapshots_by_name ON snapshots (name);
+CREATE INDEX IF NOT EXISTS snapshots_transitions ON snapshots (run_at) WHERE was_dormant != is_dormant;
+"""
+
+DAYS_AGO = re.compile(r'^(\d+) days ago$')
+
+
+def run_id_for(path):
+    """Returns the run ID in a report file name, or None."""
+    match = SNAPSHOT_FILE_PATTERN.search(os.path.basename(path))
+    return match.group(1) if match else None
+
+
+def run_time(run_id):
+    return datetime.strptime(run_id, RUN_ID_FORMAT).timestamp()
+
+
+def _flag(value):
+    """'Yes'/'No' -> 1/0; anything else (Unknown, N/A) -> None."""
+    return {'Yes': 1, 'No': 0}.get(value)
+
+
+def _last_ts_from_label(label, run_at):
+    """Approximates a last message time from an old report's 'last_active' text."""
+    if label == 'Today':
+        return run_at
+    if label == 'Yesterday':
+        return run_at - 86400
+    match = DAYS_AGO.match(label or '')
+    return run_at - int(match.group(1)) * 86400 if match else None
+
+
+class AuditHistory:
+    """A SQLite time series of per-channel audit results."""
+
+    def __init__(self, path=HISTORY_DB_FILE):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # Losing the last few rows to a power cut is fine; an fsync per channel is not
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def has_run(self, run_id):
+        return self.conn.execute("SELECT 1 FROM runs WHERE run_id = ?", (run_id,)).fetchone() is not None
+
+    def start_run(self, run_id, source='audit'):
+        """Registers a run; starting a run that already exists (a --resume) reopens it."""
+        self.conn.execute(
+            "INSERT INTO runs (run_id, run_at, source) VALUES (?, ?, ?)"
+            " ON CONFLICT (run_id) DO UPDATE SET channels = NULL, active = NULL, dormant = NULL",
+            (run_id, run_time(run_id), source),
+        )
+        self.conn.commit()
+
+    def _run_counts(self, run_at):
+        return self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(is_dormant = 0), 0), COALESCE(SUM(is_dormant = 1), 0)"
+            " FROM snapshots WHERE run_at = ?",
+            (run_at,),
+        ).fetchone()
+
+    def finish_run(self, run_id):
+        """Stores a completed run's channel, active and dormant counts."""
+        run_at = run_time(run_id)
+        self.conn.execute(
+            "UPDATE runs SET channels = ?, active = ?, dormant = ? WHERE run_id = ?",
+            (*self._run_counts(run_at), run_id),
+        )
+        self.conn.commit()
+
+    def _previous(self, channel_id, run_at):
+        """The channel's (is_dormant, run_id) in its last run before `run_at` with a known dormancy."""
+        return self.conn.execute(
+            "SELECT is_dormant, run_id FROM snapshots"
+            " WHERE channel_id = ? AND run_at < ? AND is_dormant IS NOT NULL"
+            " ORDER BY run_at DESC LIMIT 1",
+            (channel_id, run_at),
+        ).fetchone() or (None, None)
+
+    def add(self, run_id, record, last_ts=None, commit=True):
+        """Records one channel's audit record for a run.
+
+        `last_ts` is the latest message ts ('' for no messages, None if unknown).
+        Runs may be added in any order; a backfilled snapshot relinks the one after it.
+        """
+        channel_id = record['channel_id']
+        run_at = run_time(run_id)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO snapshots"
+            " (channel_id, run_id, run_at, name, last_ts, is_dormant, members_count, bot_is_member,"
+            "  was_dormant, previous_run_id)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (channel_id, run_id, run_at, record['name'],
+             float(last_ts) if last_ts else None, _flag(record.get('is_dormant')),
+             record.get('members_count'), _flag(record.get('bot_is_member')),
+             *self._previous(channel_id, run_at)),
+        )
+        following = self.conn.execute(
+            "SELECT run_at FROM snapshots WHERE channel_id = ? AND run_at > ? AND is_dormant IS NOT NULL"
+            " ORDER BY run_at LIMIT 1",
+            (channel_id, run_at),
+        ).fetchone()
+        if following:
+            self.conn.execute(
+                "UPDATE snapshots SET was_dormant = ?, previous_run_id = ? WHERE channel_id = ? AND run_at = ?",
+                (*self._previous(channel_id, following[0]), channel_id, following[0]),
+            )
+        if commit:
+            self.conn.commit()
+
+    def import_snapshot(self, path):
+        """Backfills a run from an old JSON (or NDJSON) report. Returns the number of channels."""
+        run_id = run_id_for(path)
+        run_at = run_time(run_id)
+        with open(path, 'r', encoding='utf-8') as f:
+            if path.endswith('.ndjson'):
+                records = [json.loads(line) for line in f if line.endswith('\n')]
+            else:
+                report = json.load(f)
+                records = report['channels'] if isinstance(report, dict) else report
+        self.start_run(run_id, source='import')
+        for record in records:
+            self.add(run_id, record, _last_ts_from_label(record.get('last_active'), run_at), commit=False)
+        self.finish_run(run_id)
+        return len(records)
+
+    def runs(self):
+        """Every run as (run_id, run_at, source, channels, active, dormant), oldest first.
+
+        Unfinished runs (interrupted, or still going) are counted on the fly.
+        """
+        runs = []
+        for run in self.conn.execute("SELECT * FROM runs ORDER BY run_at").fetchall():
+            counts = tuple(run)[3:] if run['channels'] is not None else self._run_counts(run['run_at'])
+            runs.append((run['run_id'], run['run_at'], run['source'], *counts))
+        return runs
+
+    def transitions(self, since=None, until=None):
+        """Snapshots in runs within [since, until] whose dormancy differs from the channel's previous run.
+
+        A channel that was already dormant going into the window is not reported again.
+        """
+        return self.conn.execute(
+            "SELECT * FROM snapshots"
+            " WHERE was_dormant != is_dormant AND run_at >= ? AND run_at <= ?"
+            " ORDER BY run_at, name",
+            (since or 0, until if until is not None else float('inf')),
+        ).fetchall()
+
+    def trend(self, channel):
+        """Every snapshot of a channel (by ID or name), oldest first."""
+        return self.conn.execute(
+            "SELECT * FROM snapshots WHERE channel_id IN"
+            " (SELECT ? UNION SELECT channel_id FROM snapshots WHERE name = ?)"
+            " ORDER BY run_at",
+            (channel, channel),
+        ).fetchall()
+
+    def close(self):
+        self.conn.close()
+
+
+def _date(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M') if timestamp else '-'
+
+
+def _parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').timestamp()
+
+
+def cmd_import(history, args):
+    imported = 0
+    for path in args.files:
+        run_id = run_id_for(path)
+        if not run_id:
+            print(f"Skipping {path}: not a project_channels_<timestamp> report", file=sys.stderr)
+            continue
+        if history.has_run(run_id) and not args.force:
+            print(f"Skipping {path}: run {run_id} is already in the history")
+            continue
+        count = history.import_snapshot(path)
+        imported += 1
+        print(f"Imported {count} channels from {path}")
+    print(f"\nImported {imported} snapshots.")
+
+
+def cmd_runs(history, args):
+    print(f"{'Run':<16} | {'Date':<16} | {'Source':<6} | {'Channels':>8} | {'Active':>6} | {'Dormant':>7}")
+    print("-" * 75)
+    for run_id, run_at, source, channels, active, dormant in history.runs():
+        print(f"{run_id:<16} | {_date(run_at):<16} | {source:<6} | {channels:>8} | {active:>6} | {dormant:>7}")
+
+
+def cmd_transitions(history, args):
+    since = _parse_date(args.since) if args.since else None
+    until = _parse_date(args.until) + 86400 if args.until else None
+    rows = history.transitions(since, until)
+    if args.json:
+        print(json.dumps([{
+            'channel_id': row['channel_id'],
+            'name': row['name'],
+            'change': 'went_dormant' if row['is_dormant'] else 'revived',
+            'run_id': row['run_id'],
+            'previous_run_id': row['previous_run_id'],
+            'last_message': _date(row['last_ts']),
+        } for row in rows], separators=(',', ':')))
+        return
+
+    went_dormant = [row for row in rows if row['is_dormant']]
+    revived = [row for row in rows if not row['is_dormant']]
+    for title, group in (("Went dormant", went_dormant), ("Revived", revived)):
+        print(f"\n--- {title} ({len(group)}) ---")
+        for row in group:
+            print(f"{row['name']:<30} | {row['channel_id']:<12} | seen in run {row['run_id']} | "
+                  f"last message {_date(row['last_ts'])}")
+
+
+def cmd_trend(history, args):
+    rows = history.trend(args.channel)
+    if not rows:
+        print(f"No history for '{args.channel}'.")
+        return
+    print(f"{'Run':<16} | {'Last message':<16} | {'Dormant':<7} | {'Members':>7} | Bot member")
+    print("-" * 70)
+    labels = {1: 'Yes', 0: 'No', None: '?'}
+    for row in rows:
+        print(f"{row['run_id']:<16} | {_date(row['last_ts']):<16} | {labels[row['is_dormant']]:<7} | "
+              f"{row['members_count'] if row['members_count'] is not None else '-':>7} | {labels[row['bot_is_member']]}")
+
+
+def parse_args():
+    """Parses command-line arguments."""
+    parser = argparse.ArgumentParser(description="Query the history of Slack project channel audits.")
+    parser.add_argument('--reports-dir', default=OUTPUT_DIR,
+                        help=f"Auditor reports directory holding {HISTORY_DB_NAME} (default: {OUTPUT_DIR})")
+    parser.add_argument('--db', help=f"History database (default: {HISTORY_DB_NAME} in --reports-dir)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = commands.add_parser('import', help="Backfill old project_channels_*.json reports")
+    import_parser.add_argument('files', nargs='+')
+    import_parser.add_argument('--force', action='store_true', help="Re-import runs already in the history")
+
+    commands.add_parser('runs', help="List runs with active/dormant counts")
+
+    transitions_parser = commands.add_parser('transitions', help="Channels that went dormant or revived")
+    transitions_parser.add_argument('--since', help="Only transitions seen on or after this date (YYYY-MM-DD)")
+    transitions_parser.add_argument('--until', help="Only transitions seen on or before this date (YYYY-MM-DD)")
+    transitions_parser.add_argument('--json', action='store_true', help="Print compact JSON")
+
+    trend_parser = commands.add_parser('trend', help="One channel's activity across runs")
+    trend_parser.add_argument('channel', help="Channel name or ID")
+    return parser.parse_args()
+
+
+def main():
+    """Main execution function."""
+    args = parse_args()
+    history = AuditHistory(os.path.expanduser(args.db or os.path.join(args.reports_dir, HISTORY_DB_NAME)))
+    try:
+        {
+            'import': cmd_import,
+            'runs': cmd_runs,
+            'transitions': cmd_transitions,
+            'trend': cmd_trend,
+        }[args.command](history, args)
+    finally:
+        history.close()
+
+
+if __name__ == "__main__":
+    main()
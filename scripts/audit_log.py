@@ -0,0 +1,139 @@
+"""
+Append-only NDJSON log of per-channel audit records.
+
+The auditor appends one JSON line per channel as soon as it is audited, so a
+killed run keeps everything finished so far. The sorted JSON and Markdown
+reports are built from the log afterwards: only each record's sort key and
+byte offset are held in memory, and records are streamed back one at a time.
+
+A `Checkpoint` records which channels are finished and how much of the log
+holds their results, so an interrupted run can be resumed.
+"""
+
+import json
+import os
+import time
+
+# Minimum seconds between checkpoint writes while a run is in progress.
+CHECKPOINT_INTERVAL = 2.0
+
+
+class AuditLog:
+    """Appends audit records to an NDJSON file, one flushed line per record."""
+
+    def __init__(self, path, truncate_at=None):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        if truncate_at is not None:
+            # Drop anything written after the last checkpoint, including a torn line
+            with open(path, 'r+b') as f:
+                f.truncate(truncate_at)
+        self._file = open(path, 'ab')
+
+    def append(self, record):
+        self._file.write((json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8'))
+        self._file.flush()
+
+    def tell(self):
+        """Returns the byte offset just past the last complete record."""
+        return self._file.tell()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_index(path, key='name', id_key='channel_id'):
+    """Returns [(sort_key, offset)] for every complete record, sorted by key.
+
+    When a channel was audited more than once (a retry after --resume), only
+    its last record is kept. A torn last line left by a killed run is ignored.
+    """
+    latest = {}
+    offset = 0
+    with open(path, 'rb') as f:
+        for line in f:
+            if line.endswith(b'\n'):
+                try:
+                    record = json.loads(line)
+                    latest[record[id_key]] = (record[key], offset)
+                except ValueError:
+                    pass
+            offset += len(line)
+    return sorted(latest.values())
+
+
+def iter_records(path, index):
+    """Yields the records at each offset in `index`, in index order."""
+    with open(path, 'rb') as f:
+        for _, offset in index:
+            f.seek(offset)
+            yield json.loads(f.readline())
+
+
+def write_atomic(path, data):
+    """Writes JSON to `path` via a temp file and rename, so readers never see a partial file."""
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class Checkpoint:
+    """Tracks finished channel IDs and the log offset that holds their results.
+
+    `emails` and `user_ids` record what the run checked, so a resume that asks
+    for different users can start over instead of mixing incompatible records.
+    """
+
+    def __init__(self, path, log_file, emails, user_ids, completed=(), offset=0):
+        self.path = path
+        self.log_file = log_file
+        self.emails = list(emails)
+        self.user_ids = sorted(user_ids)
+        self.completed = set(completed)
+        self.offset = offset
+        self._saved_at = 0.0
+
+    @classmethod
+    def load(cls, path):
+        """Returns the checkpoint saved at `path`, or None if there is none."""
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        # Checkpoints written before emails were recorded never match a resume
+        return cls(path, data['log_file'], data.get('emails') or (), data['user_ids'],
+                   data['completed'], data['offset'])
+
+    def mark_done(self, channel_id, offset):
+        """Records a finished channel; saves at most every CHECKPOINT_INTERVAL seconds."""
+        self.completed.add(channel_id)
+        self.offset = offset
+        if time.monotonic() - self._saved_at >= CHECKPOINT_INTERVAL:
+            self.save()
+
+    def advance(self, offset):
+        """Moves the offset past a record whose channel still needs retrying."""
+        self.offset = offset
+
+    def save(self):
+        write_atomic(self.path, {
+            'log_file': self.log_file,
+            'emails': self.emails,
+            'user_ids': self.user_ids,
+            'completed': sorted(self.completed),
+            'offset': self.offset,
+        })
+        self._saved_at = time.monotonic()
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Benchmarks list_all_proj_channels_slack.py against a local fake Slack server.
+
+For each workspace size, a synthetic workspace is served by fake_slack.py and
+the auditor is run against it (in a subprocess, from a scratch directory, so
+its reports and state cache never touch the real ones) in each audit mode:
+
+- full:        a fresh run with an empty state cache
+- incremental: --incremental straight after the full run
+- team:        a full scan checking --team-size emails at once
+- resume:      a run killed part-way, then finished with --resume
+
+Reports wall-clock time, calls made, calls per second and 429s per mode.
+Rate tiers are scaled on both sides (SLACK_RATE_SCALE and the server's
+--rate-scale) so large workspaces finish in minutes instead of hours.
+
+Example:
+    python bench_slack_audit.py --sizes 100,1000,10000 --latency-ms 20
+"""
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+from fake_slack import FakeSlackServer, Workspace
+
+AUDITOR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'list_all_proj_channels_slack.py')
+
+MODES = ['full', 'incremental', 'team', 'resume']
+
+DEFAULT_SIZES = '100,1000,10000'
+DEFAULT_LATENCY_MS = 20
+DEFAULT_RATE_SCALE = 100
+DEFAULT_TEAM_SIZE = 5
+
+# In resume mode, the first run is interrupted after this share of the audit calls.
+RESUME_INTERRUPT_AT = 0.5
+
+
+def run_auditor(server, work_dir, args, rate_scale, stop_after_calls=None):
+    """Runs the auditor to completion (or until the server has seen `stop_after_calls` calls).
+
+    Returns (exit_code, wall_seconds).
+    """
+    env = dict(os.environ, SLACK_API_URL=server.url, SLACK_TOKEN='xoxb-fake',
+               SLACK_RATE_SCALE=str(rate_scale), FRESHA_EMAIL='user0@example.com')
+    started = time.monotonic()
+    process = subprocess.Popen([sys.executable, AUDITOR, *args], cwd=work_dir, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if stop_after_calls:
+        while process.poll() is None and sum(server.stats['calls'].values()) < stop_after_calls:
+            time.sleep(0.01)
+        if process.poll() is None:
+            process.send_signal(signal.SIGINT)
+    code = process.wait()
+    return code, time.monotonic() - started
+
+
+def bench_size(size, modes, latency_ms, rate_scale, workers, team_size):
+    """Runs every mode against one workspace size and returns a result row per mode."""
+    results = []
+    server = FakeSlackServer(Workspace(size), latency_ms=latency_ms, rate_scale=rate_scale).start()
+    try:
+        with tempfile.TemporaryDirectory() as scratch:
+            work_dir = os.path.join(scratch, 'work')
+            os.makedirs(work_dir)
+            base_args = ['--workers', str(workers)]
+            full_calls = None
+
+            for mode in modes:
+                server.reset_stats()
+                if mode == 'incremental' and full_calls is None:
+                    # Incremental runs need a populated cache to measure anything
+                    run_auditor(server, work_dir, base_args, rate_scale)
+                    server.reset_stats()
+
+                if mode == 'full':
+                    code, wall = run_auditor(server, work_dir, base_args, rate_scale)
+                    full_calls = sum(server.stats['calls'].values())
+                elif mode == 'incremental':
+                    code, wall = run_auditor(server, work_dir, [*base_args, '--incremental'], rate_scale)
+                elif mode == 'team':
+                    emails = ','.join(f'user{i}@example.com' for i in range(team_size))
+                    code, wall = run_auditor(server, work_dir, [*base_args, '--emails', emails], rate_scale)
+                elif mode == 'resume':
+                    stop_at = int((full_calls or size) * RESUME_INTERRUPT_AT)
+                    _, first_wall = run_auditor(server, work_dir, base_args, rate_scale, stop_after_calls=stop_at)
+                    code, wall = run_auditor(server, work_dir, [*base_args, '--resume'], rate_scale)
+                    wall += first_wall
+
+                calls = sum(server.stats['calls'].values())
+                results.append({
+                    'channels': size,
+                    'mode': mode,
+                    'exit_code': code,
+                    'wall_seconds': round(wall, 3),
+                    'calls': calls,
+                    'calls_per_second': round(calls / wall, 1) if wall else 0,
+                    'rate_limited': sum(server.stats['rate_limited'].values()),
+                    'calls_by_method': dict(server.stats['calls']),
+                })
+                print_row(results[-1])
+    finally:
+        server.stop()
+    return results
+
+
+def print_header():
+    print(f"{'Channels':>8} | {'Mode':<11} | {'Wall (s)':>9} | {'Calls':>7} | {'Calls/s':>8} | {'429s':>5} | Exit")
+    print("-" * 68)
+
+
+def print_row(result):
+    print(f"{result['channels']:>8} | {result['mode']:<11} | {result['wall_seconds']:>9.2f} | {result['calls']:>7} | "
+          f"{result['calls_per_second']:>8.1f} | {result['rate_limited']:>5} | {result['exit_code']}")
+
+
+def parse_args():
+    """Parses command-line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark the Slack channel auditor against a fake Slack server.")
+    parser.add_argument('--sizes', default=DEFAULT_SIZES,
+                        help=f"Comma-separated workspace sizes in channels (default: {DEFAULT_SIZES})")
+    parser.add_argument('--modes', default=','.join(MODES),
+                        help=f"Comma-separated audit modes to run (default: {','.join(MODES)})")
+    parser.add_argument('--latency-ms', type=float, default=DEFAULT_LATENCY_MS,
+                        help=f"Fake server latency per call (default: {DEFAULT_LATENCY_MS})")
+    parser.add_argument('--rate-scale', type=float, default=DEFAULT_RATE_SCALE,
+                        help=f"Multiply every Slack rate tier by this on both sides (default: {DEFAULT_RATE_SCALE})")
+    parser.add_argument('--workers', type=int, default=8, help="Auditor --workers (default: 8)")
+    parser.add_argument('--team-size', type=int, default=DEFAULT_TEAM_SIZE,
+                        help=f"Emails checked in team mode (default: {DEFAULT_TEAM_SIZE})")
+    parser.add_argument('--output', help="Also write the results as JSON to this file")
+    return parser.parse_args()
+
+
+def main():
+    """Main execution function."""
+    args = parse_args()
+    modes = [mode for mode in args.modes.split(',') if mode]
+    unknown = set(modes) - set(MODES)
+    if unknown:
+        print(f"Error: unknown modes: {', '.join(sorted(unknown))}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"Latency {args.latency_ms}ms, rate tiers x{args.rate_scale}, {args.workers} workers\n")
+    print_header()
+    results = []
+    for size in (int(s) for s in args.sizes.split(',')):
+        results.extend(bench_size(size, modes, args.latency_ms, args.rate_scale, args.workers, args.team_size))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if any(result['exit_code'] != 0 for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+On-disk channel state cache for the Slack project channel auditor.
+
+Stores, per channel, the `updated`/`num_members` metadata seen in
+`conversations.list` along with the last message `ts` and which of the
+checked users were members at the last audit. Incremental runs reuse an
+entry while the channel's metadata is unchanged, the same users are being
+checked and the entry is younger than the cache TTL.
+
+It also keeps a user directory of email -> user ID lookups, which never
+expire since Slack user IDs are stable.
+
+The store is a single SQLite file kept next to the report output. It is only
+touched from the main thread; workers receive plain dicts.
+"""
+
+import json
+import os
+import sqlite3
+import time
+
+# Bump when the schema changes; the cache is rebuilt rather than migrated.
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS channels (
+    channel_id  TEXT PRIMARY KEY,
+    name        TEXT NOT NULL,
+    updated     INTEGER,
+    num_members INTEGER,
+    last_ts     TEXT,
+    user_ids    TEXT NOT NULL,
+    member_ids  TEXT NOT NULL,
+    audited_at  REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS users (
+    email   TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL
+);
+"""
+
+
+def _encode_ids(user_ids):
+    return json.dumps(sorted(user_ids))
+
+
+class ChannelStateStore:
+    """A SQLite-backed cache of per-channel audit results."""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            self.conn.executescript(
+                "DROP TABLE IF EXISTS channels; DROP TABLE IF EXISTS users;"
+                f" PRAGMA user_version = {SCHEMA_VERSION};"
+            )
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def load(self):
+        """Returns every cached entry keyed by channel ID.
+
+        `user_ids` and `member_ids` are decoded into sets.
+        """
+        entries = {}
+        for row in self.conn.execute("SELECT * FROM channels"):
+            entry = dict(row)
+            entry['user_ids'] = set(json.loads(entry['user_ids']))
+            entry['member_ids'] = set(json.loads(entry['member_ids']))
+            entries[entry['channel_id']] = entry
+        return entries
+
+    def save(self, channel, last_ts, user_ids, member_ids):
+        """Records the audit result for `channel` (a `conversations.list` entry).
+
+        `last_ts` is the latest message ts, or '' when the channel has no messages.
+        `member_ids` is the subset of the checked `user_ids` found in the channel.
+        """
+        self.conn.execute(
+            "INSERT OR REPLACE INTO channels"
+            " (channel_id, name, updated, num_members, last_ts, user_ids, member_ids, audited_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (channel['id'], channel['name'], channel.get('updated'), channel.get('num_members'),
+             last_ts, _encode_ids(user_ids), _encode_ids(member_ids), time.time()),
+        )
+        self.conn.commit()
+
+    def load_users(self, emails):
+        """Returns the cached email -> user ID mapping for `emails`."""
+        cached = {}
+        for email in emails:
+            row = self.conn.execute("SELECT user_id FROM users WHERE email = ?", (email,)).fetchone()
+            if row:
+                cached[email] = row['user_id']
+        return cached
+
+    def save_users(self, user_ids_by_email):
+        """Caches resolved email -> user ID lookups."""
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO users (email, user_id) VALUES (?, ?)",
+            user_ids_by_email.items(),
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+def is_fresh(entry, channel, user_ids, max_age_seconds):
+    """True if a cached entry can stand in for re-auditing `channel`."""
+    if not entry or not channel.get('is_member', False):
+        return False
+    if time.time() - entry['audited_at'] > max_age_seconds:
+        return False
+    return (
+        entry['updated'] == channel.get('updated')
+        and entry['num_members'] == channel.get('num_members')
+        and entry['user_ids'] == set(user_ids)
+    )
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Extracts structured project updates from monitored Slack project channels.
+
+Project channels post status updates in this shape:
+
+    *Feature:* Online deposits
+    *Status:* In development :hammer:
+    *Health:* On track :large_green_circle:
+    *Release date:* 2026-11-02 (75%)
+
+For each monitored channel (the "✅ Member" entries of
+projects_to_monitor.md, resolved to channel IDs through the latest
+project_channels_*.json report), `conversations.history` is fetched with an
+`oldest` bound and cursor pagination, channels concurrently, through the
+auditor's pooled, rate-limited `SlackClient`. Updates are parsed with
+precompiled patterns as each page arrives.
+
+Parsed updates and each channel's fetched window (oldest bound and
+high-water `ts`) are cached in a SQLite file next to the reports, so a
+repeat 7d or 30d scan only downloads messages newer than the high-water
+mark (plus any older range the new window adds). Edits to old messages and
+thread replies are not picked up.
+
+The result is printed as compact JSON; progress goes to stderr.
+
+Usage:
+    python extract_project_updates.py 7d --reports-dir ~/_apps/_claude/tmp_output
+    python extract_project_updates.py 30d --channels proj-2fa,proj-amex-phase-1 --output updates.json
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from list_all_proj_channels_slack import MAX_WORKERS, OUTPUT_DIR, get_slack_token
+from slack_client import SlackAPIError, get_client
+
+# The scripts live next to command_resources/ (~/.claude/scripts, ~/.claude/command_resources)
+MONITOR_FILE = os.path.normpath(os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'command_resources', 'projects_to_monitor.md'))
+# Kept in the auditor's reports directory (--reports-dir)
+CACHE_DB_NAME = 'project_updates.sqlite'
+
+# Page size for conversations.history (Slack allows up to 999).
+HISTORY_PAGE_SIZE = 200
+
+# The high-water mark never trails the fetch start by more than this, so quiet
+# channels advance too; a margin for clock skew, as messages inside it are refetched.
+HIGH_WATER_MARGIN = 300
+
+# If set (e.g. https://example.slack.com), updates include a message link.
+WORKSPACE_URL = os.environ.get('SLACK_WORKSPACE_URL', '').rstrip('/')
+
+# Bump when the schema or the update parser changes; the cache is rebuilt rather than migrated.
+CACHE_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS channels (
+    channel_id TEXT PRIMARY KEY,
+    oldest     REAL NOT NULL,
+    high_water TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS updates (
+    channel_id            TEXT NOT NULL,
+    ts                    TEXT NOT NULL,
+    author                TEXT,
+    feature               TEXT NOT NULL,
+    status                TEXT,
+    health                TEXT,
+    health_indicator      TEXT,
+    release_date          TEXT,
+    completion_percentage INTEGER,
+    text                  TEXT NOT NULL,
+    PRIMARY KEY (channel_id, ts)
+) WITHOUT ROWID;
+"""
+
+
+def _field(label):
+    """A pattern for one "Label: value" line, e.g. "*Feature:* Name" or "• _Status_: ..."."""
+    return re.compile(rf'^[\s*_>•-]*{label}[\s*_]*:[\s*_]*(.+?)[\s*_]*$', re.IGNORECASE | re.MULTILINE)
+
+
+FEATURE_PATTERN = _field('Feature')
+STATUS_PATTERN = _field('Status')
+HEALTH_PATTERN = _field('Health')
+RELEASE_DATE_PATTERN = _field(r'Release\s+date')
+PERCENTAGE_PATTERN = re.compile(r'\(?\s*(\d{1,3})\s*%\s*\)?')
+SHORTCODE_PATTERN = re.compile(r':[a-z0-9_+-]+:')
+
+HEALTH_EMOJI = {
+    '🟢': '🟢', ':large_green_circle:': '🟢', ':green_circle:': '🟢',
+    '🟡': '🟡', ':large_yellow_circle:': '🟡', ':yellow_circle:': '🟡',
+    '🔴': '🔴', ':red_circle:': '🔴', ':large_red_circle:': '🔴',
+}
+HEALTH_WORDS = [
+    (re.compile(r'blocked|off[\s-]track|critical', re.IGNORECASE), '🔴'),
+    (re.compile(r'at[\s-]risk|delayed|warning', re.IGNORECASE), '🟡'),
+    (re.compile(r'on[\s-]track|healthy|good', re.IGNORECASE), '🟢'),
+]
+EMOJI_CHARS = ''.join({emoji for emoji in HEALTH_EMOJI.values()})
+
+
+def _clean(value):
+    """Drops emoji shortcodes and health emoji from a field value."""
+    value = SHORTCODE_PATTERN.sub('', value).strip(' ' + EMOJI_CHARS)
+    return value or None
+
+
+def _health_indicator(health):
+    for marker, emoji in HEALTH_EMOJI.items():
+        if marker in health:
+            return emoji
+    for pattern, emoji in HEALTH_WORDS:
+        if pattern.search(health):
+            return emoji
+    return None
+
+
+def parse_update(message):
+    """Returns the structured update in a message, or None if it is not one.
+
+    A message is an update if it has a Feature line and at least one of
+    Status, Health or Release date.
+    """
+    text = message.get('text') or ''
+    feature = FEATURE_PATTERN.search(text)
+    if not feature:
+        return None
+    status = STATUS_PATTERN.search(text)
+    health = HEALTH_PATTERN.search(text)
+    release = RELEASE_DATE_PATTERN.search(text)
+    if not (status or health or release):
+        return None
+
+    release_date = completion = None
+    if release:
+        release_date = release.group(1)
+        percentage = PERCENTAGE_PATTERN.search(release_date)
+        if percentage:
+            completion = int(percentage.group(1))
+            release_date = release_date[:percentage.start()] + release_date[percentage.end():]
+        release_date = _clean(release_date)
+    return {
+        'ts': message['ts'],
+        'author': message.get('user') or message.get('username'),
+        'feature': _clean(feature.group(1)) or feature.group(1),
+        'status': _clean(status.group(1)) if status else None,
+        'health': _clean(health.group(1)) if health else None,
+        'health_indicator': _health_indicator(health.group(1)) if health else None,
+        'release_date': release_date,
+        'completion_percentage': completion,
+        'text': text,
+    }
+
+
+class UpdateCache:
+    """A SQLite cache of parsed updates and of the history window fetched per channel."""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != CACHE_VERSION:
+            self.conn.executescript(
+                "DROP TABLE IF EXISTS channels; DROP TABLE IF EXISTS updates;"
+                f" PRAGMA user_version = {CACHE_VERSION};"
+            )
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def window(self, channel_id):
+        """Returns (oldest, high_water) already fetched for a channel, or None."""
+        row = self.conn.execute(
+            "SELECT oldest, high_water FROM channels WHERE channel_id = ?", (channel_id,)
+        ).fetchone()
+        return (row['oldest'], row['high_water']) if row else None
+
+    def save(self, channel_id, oldest, high_water, updates):
+        """Records a channel's fetched window and the updates found in it."""
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO updates"
+            " (channel_id, ts, author, feature, status, health, health_indicator, release_date,"
+            "  completion_percentage, text)"
+            " VALUES (:channel_id, :ts, :author, :feature, :status, :health, :health_indicator,"
+            "  :release_date, :completion_percentage, :text)",
+            [dict(update, channel_id=channel_id) for update in updates],
+        )
+        self.conn.execute(
+            "INSERT OR REPLACE INTO channels (channel_id, oldest, high_water, fetched_at) VALUES (?, ?, ?, ?)",
+            (channel_id, oldest, high_water, time.time()),
+        )
+        self.conn.commit()
+
+    def updates(self, channel_id, since):
+        """Cached updates for a channel posted at or after `since`, newest first."""
+        return [dict(row) for row in self.conn.execute(
+            "SELECT * FROM updates WHERE channel_id = ? AND ts >= ? ORDER BY ts DESC",
+            (channel_id, f'{since:.6f}'),
+        )]
+
+    def close(self):
+        self.conn.close()
+
+
+def plan_fetch(window, since):
+    """Works out what to download to cover `since` until now.
+
+    Returns (ranges, oldest, high_water): the (oldest, latest) history ranges
+    to fetch, where `latest` None means "up to now" (Slack treats both bounds
+    as exclusive), and the channel's window once they have been fetched.
+    """
+    if window is None or since > float(window[1]):
+        # Nothing cached, or the cached window ended before this one starts
+        start = f'{since:.6f}'
+        return [(start, None)], since, start
+    oldest, high_water = window
+    ranges = []
+    if since < oldest:
+        ranges.append((f'{since:.6f}', f'{oldest:.6f}'))
+    ranges.append((high_water, None))
+    return ranges, min(since, oldest), high_water
+
+
+def fetch_updates(client, channel_id, ranges):
+    """Fetches each history range, parsing updates as pages arrive.
+
+    Returns (updates, newest_ts, message_count); `newest_ts` is None if no
+    message was newer than the ranges' bounds. Raises SlackAPIError on failure.
+    """
+    updates = []
+    newest_ts = None
+    count = 0
+    for oldest, latest in ranges:
+        params = {'channel': channel_id, 'oldest': oldest, 'limit': HISTORY_PAGE_SIZE}
+        if latest:
+            params['latest'] = latest
+        for messages in client.paginate('conversations.history', params, 'messages'):
+            count += len(messages)
+            for message in messages:
+                if newest_ts is None or float(message['ts']) > float(newest_ts):
+                    newest_ts = message['ts']
+                update = parse_update(message)
+                if update:
+                    updates.append(update)
+    return updates, newest_ts, count
+
+
+def load_monitored_channels(path):
+    """Returns the names of the "✅ Member" channels in projects_to_monitor.md."""
+    names = []
+    current = None
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.startswith('### '):
+                current = line[4:].strip().lstrip('#')
+            elif current and line.lstrip('- ').startswith('**Your Membership:**') and '✅' in line:
+                names.append(current)
+                current = None
+    return names
+
+
+def load_channel_ids(reports_dir):
+    """Maps channel name -> ID from the newest project_channels_*.json report in `reports_dir`."""
+    reports = sorted(glob.glob(os.path.join(reports_dir, 'project_channels_*.json')))
+    if not reports:
+        return {}
+    with open(reports[-1], 'r', encoding='utf-8') as f:
+        report = json.load(f)
+    channels = report['channels'] if isinstance(report, dict) else report
+    return {channel['name']: channel['channel_id'] for channel in channels}
+
+
+def parse_days(value):
+    """Accepts '7', '7d' or '30d'."""
+    match = re.fullmatch(r'(\d+)d?', value.strip())
+    if not match or int(match.group(1)) < 1:
+        raise argparse.ArgumentTypeError(f"expected a number of days like 7d, got '{value}'")
+    return int(match.group(1))
+
+
+def format_update(channel_id, update, with_text):
+    """Shapes a cached update for the JSON output."""
+    posted = datetime.fromtimestamp(float(update['ts']))
+    result = {
+        'date': posted.strftime('%Y-%m-%d'),
+        'timestamp': posted.isoformat(timespec='seconds'),
+        'feature': update['feature'],
+        'status': update['status'],
+        'health': update['health'],
+        'health_indicator': update['health_indicator'],
+        'release_date': update['release_date'],
+        'completion_percentage': update['completion_percentage'],
+        'author': update['author'],
+        'ts': update['ts'],
+    }
+    if WORKSPACE_URL:
+        result['slack_message_link'] = f"{WORKSPACE_URL}/archives/{channel_id}/p{update['ts'].replace('.', '')}"
+    if with_text:
+        result['summary_text'] = update['text']
+    return result
+
+
+def parse_args():
+    """Parses command-line arguments."""
+    parser = argparse.ArgumentParser(description="Extract structured project updates from Slack project channels.")
+    parser.add_argument('days', type=parse_days, help="How far back to look, e.g. 7d or 30d")
+    parser.add_argument('--channels', help="Comma-separated channel names (default: member channels in the monitor file)")
+    parser.add_argument('--monitor-file', default=MONITOR_FILE, help=f"Channels to monitor (default: {MONITOR_FILE})")
+    parser.add_argument('--reports-dir', default=OUTPUT_DIR,
+                        help=f"The auditor's reports directory, also holding the update cache (default: {OUTPUT_DIR})")
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS,
+                        help=f"Number of channels fetched concurrently (default: {MAX_WORKERS})")
+    parser.add_argument('--text', action='store_true', help="Include each update's full message text")
+    parser.add_argument('--output', help="Write the JSON here instead of stdout")
+    return parser.parse_args()
+
+
+def main():
+    """Main execution function."""
+    args = parse_args()
+    if args.channels:
+        names = [name.strip().lstrip('#') for name in args.channels.split(',') if name.strip()]
+    else:
+        names = load_monitored_channels(args.monitor_file)
+
+    reports_dir = os.path.expanduser(args.reports_dir)
+    channel_ids = load_channel_ids(reports_dir)
+    if not channel_ids:
+        print(f"Warning: no project_channels_*.json report in {os.path.abspath(reports_dir)}; "
+              f"run list_all_proj_channels_slack.py with the same --reports-dir.", file=sys.stderr)
+    unresolved = [name for name in names if name not in channel_ids]
+    if unresolved and channel_ids:
+        print(f"Warning: no channel ID for {len(unresolved)} channels; run list_all_proj_channels_slack.py "
+              f"to refresh the report.", file=sys.stderr)
+    channels = {channel_ids[name]: name for name in names if name in channel_ids}
+
+    client = get_client(get_slack_token())
+    cache = UpdateCache(os.path.join(reports_dir, CACHE_DB_NAME))
+    started = time.time()
+    since = started - args.days * 86400
+    errors = []
+    fetched = 0
+
+    print(f"Fetching the last {args.days} days of {len(channels)} channels with {args.workers} workers...",
+          file=sys.stderr)
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+        futures = {}
+        for channel_id in channels:
+            ranges, oldest, high_water = plan_fetch(cache.window(channel_id), since)
+            futures[executor.submit(fetch_updates, client, channel_id, ranges)] = (channel_id, oldest, high_water)
+
+        # The cache is only touched from this thread
+        for future in as_completed(futures):
+            channel_id, oldest, high_water = futures[future]
+            try:
+                updates, newest_ts, count = future.result()
+            except SlackAPIError as e:
+                print(f"  └─ #{channels[channel_id]}: {e}", file=sys.stderr)
+                errors.append(channels[channel_id])
+                continue
+            fetched += count
+            marks = [high_water, f'{started - HIGH_WATER_MARGIN:.6f}', newest_ts]
+            cache.save(channel_id, oldest, max((mark for mark in marks if mark), key=float), updates)
+
+    projects = []
+    no_updates = []
+    for channel_id, name in sorted(channels.items(), key=lambda item: item[1]):
+        updates = cache.updates(channel_id, since)
+        if updates:
+            projects.append({
+                'channel_name': name,
+                'channel_id': channel_id,
+                'updates': [format_update(channel_id, update, args.text) for update in updates],
+            })
+        elif name not in errors:
+            no_updates.append(name)
+    cache.close()
+    client.close()
+
+    result = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'date_range_days': args.days,
+        'projects': projects,
+        'no_updates': no_updates,
+        'errors': sorted(errors),
+        'unresolved': unresolved,
+    }
+    print(f"{sum(len(p['updates']) for p in projects)} updates in {len(projects)} channels; "
+          f"downloaded {fetched} new messages.", file=sys.stderr)
+
+    output = json.dumps(result, ensure_ascii=False, separators=(',', ':'))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f"✅ JSON output written to: {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+A local stand-in for the Slack Web API, for benchmarking and testing the
+scripts without touching a real workspace.
+
+Serves a synthetic, seeded workspace of channels, members, users and message
+history over HTTP with the methods the scripts call:
+
+- conversations.list (types, exclude_archived, cursor pagination)
+- conversations.history (oldest/latest bounds, cursor pagination)
+- conversations.members (cursor pagination)
+- conversations.join
+- users.lookupByEmail
+
+Every response can be delayed (--latency-ms, --jitter-ms). Each method is
+limited to its Slack rate tier (see slack_rate_limit.py) multiplied by
+--rate-scale, answering 429 with a Retry-After header once its bucket is
+empty; --throttle-every forces a 429 on every Nth call.
+
+Point the scripts at it with SLACK_API_URL, and scale their rate limiter to
+match with SLACK_RATE_SCALE:
+
+    python fake_slack.py --channels 1000 --port 8099 --rate-scale 100
+    SLACK_API_URL=http://127.0.0.1:8099/api/ SLACK_RATE_SCALE=100 SLACK_TOKEN=xoxb-fake \\
+        python list_all_proj_channels_slack.py
+"""
+
+import argparse
+import base64
+import gzip
+import json
+import math
+import random
+import threading
+import time
+import urllib.parse
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from slack_rate_limit import DEFAULT_TIER, METHOD_TIERS, TIER_RATES
+
+# Share of channels named proj-*, like the ones the auditor looks at.
+PROJ_FRACTION = 0.6
+PRIVATE_FRACTION = 0.1
+ARCHIVED_FRACTION = 0.03
+# Share of public channels the bot is already in.
+BOT_MEMBER_FRACTION = 0.5
+# Users the scripts are likely to check (user0..user9) join this share of channels.
+CHECKED_USERS = 10
+CHECKED_USER_FRACTION = 0.3
+
+# One in this many messages is a structured project update.
+UPDATE_EVERY = 8
+STATUSES = ['On track', 'At risk', 'Blocked', 'Done']
+HEALTH = [':large_green_circle:', ':large_yellow_circle:', ':red_circle:']
+
+# Responses larger than this are gzipped when the client accepts it.
+GZIP_MIN_BYTES = 1024
+
+
+def encode_cursor(offset):
+    return base64.b64encode(f'offset:{offset}'.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        return int(base64.b64decode(cursor).decode().split(':', 1)[1])
+    except (ValueError, IndexError):
+        return None
+
+
+class Workspace:
+    """A deterministic synthetic workspace; the same seed gives the same data."""
+
+    def __init__(self, num_channels, num_users=None, seed=0):
+        rng = random.Random(seed)
+        self.seed = seed
+        self.now = time.time()
+        num_users = num_users or max(200, num_channels // 2)
+        self.users = [{'id': f'U{i:08d}', 'email': f'user{i}@example.com'} for i in range(num_users)]
+        self.users_by_email = {user['email']: user for user in self.users}
+        self.channels = []
+        self.history = {}
+        self._members = {}
+        self._messages = {}
+        self._lock = threading.Lock()
+
+        for i in range(num_channels):
+            is_private = rng.random() < PRIVATE_FRACTION
+            prefix = 'proj-' if rng.random() < PROJ_FRACTION else 'team-'
+            # Most channels are small, a few are huge and need several member pages
+            num_members = min(num_users, int(rng.paretovariate(1.1) * 4))
+            channel = {
+                'id': f'C{i:08d}',
+                'name': f'{prefix}{i}',
+                'is_channel': True,
+                'is_private': is_private,
+                'is_archived': rng.random() < ARCHIVED_FRACTION,
+                'is_member': is_private or rng.random() < BOT_MEMBER_FRACTION,
+                'num_members': num_members,
+                'created': int(self.now - 400 * 86400),
+                'updated': int((self.now - rng.uniform(0, 400) * 86400) * 1000),
+            }
+            self.channels.append(channel)
+
+            # Last activity: recent, quiet, dormant or never
+            roll = rng.random()
+            if roll < 0.05:
+                self.history[channel['id']] = (0, 0.0, 0.0)
+                continue
+            days_ago = rng.uniform(0, 7) if roll < 0.45 else rng.uniform(7, 90) if roll < 0.75 else rng.uniform(90, 400)
+            self.history[channel['id']] = (
+                rng.randint(1, 300), self.now - days_ago * 86400, rng.uniform(600, 3 * 86400),
+            )
+        self.channels_by_id = {channel['id']: channel for channel in self.channels}
+
+    def members(self, channel_id):
+        """Member user IDs of a channel, generated on first use."""
+        with self._lock:
+            if channel_id not in self._members:
+                channel = self.channels_by_id[channel_id]
+                rng = random.Random(f'{self.seed}:{channel_id}:members')
+                members = set(rng.sample(range(len(self.users)), min(channel['num_members'], len(self.users))))
+                members |= {i for i in range(min(CHECKED_USERS, len(self.users))) if rng.random() < CHECKED_USER_FRACTION}
+                self._members[channel_id] = [self.users[i]['id'] for i in sorted(members)]
+            return self._members[channel_id]
+
+    def messages(self, channel_id):
+        """A channel's messages, newest first, generated on first use."""
+        with self._lock:
+            if channel_id not in self._messages:
+                count, last_ts, gap = self.history[channel_id]
+                rng = random.Random(f'{self.seed}:{channel_id}:history')
+                messages = []
+                for n in range(count):
+                    user = self.users[rng.randrange(len(self.users))]['id']
+                    if n % UPDATE_EVERY == 0:
+                        text = (
+                            f"*Feature:* Project {channel_id} milestone {count - n}\n"
+                            f"*Status:* {rng.choice(STATUSES)}\n"
+                            f"*Health:* {rng.choice(HEALTH)}\n"
+                            f"*Release date:* {time.strftime('%Y-%m-%d', time.gmtime(last_ts + rng.randint(7, 90) * 86400))}"
+                        )
+                    else:
+                        text = f"message {count - n} in {channel_id}"
+                    messages.append({'type': 'message', 'user': user, 'text': text, 'ts': f'{last_ts - n * gap:.6f}'})
+                self._messages[channel_id] = messages
+            return self._messages[channel_id]
+
+    def join(self, channel_id):
+        with self._lock:
+            channel = self.channels_by_id[channel_id]
+            if not channel['is_member']:
+                channel['is_member'] = True
+                channel['num_members'] += 1
+            return dict(channel)
+
+
+class MethodLimiter:
+    """Server-side token bucket per method; more tolerant of bursts than the client's."""
+
+    def __init__(self, rate_scale):
+        self.rate_scale = rate_scale
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def allow(self, method):
+        """Returns 0 if the call is allowed, else the Retry-After seconds to send."""
+        rate = TIER_RATES[METHOD_TIERS.get(method, DEFAULT_TIER)] * self.rate_scale / 60.0
+        capacity = max(2.0, rate * 12)
+        with self._lock:
+            now = time.monotonic()
+            tokens, updated = self._buckets.get(method, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            if tokens >= 1:
+                self._buckets[method] = (tokens - 1, now)
+                return 0
+            self._buckets[method] = (tokens, now)
+            return max(1, math.ceil((1 - tokens) / rate))
+
+
+def _page(items, params, default_limit, max_limit):
+    """Slices one cursor page out of `items`. Returns (page, next_cursor) or None for a bad cursor."""
+    offset = decode_cursor(params['cursor']) if params.get('cursor') else 0
+    if offset is None:
+        return None
+    limit = min(int(params.get('limit') or default_limit), max_limit)
+    page = items[offset:offset + limit]
+    next_cursor = encode_cursor(offset + limit) if offset + limit < len(items) else ''
+    return page, next_cursor
+
+
+class FakeSlackHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Without this, Nagle plus delayed ACKs adds ~40ms to every keep-alive request
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        self._dispatch(url.path, dict(urllib.parse.parse_qsl(url.query)))
+
+    def do_POST(self):
+        url = urllib.parse.urlsplit(self.path)
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        if self.headers.get('Content-Type', '').startswith('application/json'):
+            params = json.loads(body or b'{}')
+        else:
+            params = dict(urllib.parse.parse_qsl(body.decode()))
+        params.update(urllib.parse.parse_qsl(url.query))
+        self._dispatch(url.path, params)
+
+    def _dispatch(self, path, params):
+        server = self.server
+        method = path.rstrip('/').rsplit('/', 1)[-1]
+        server.count('calls', method)
+
+        if server.latency:
+            time.sleep(server.latency + random.uniform(0, server.jitter))
+
+        retry_after = server.throttle(method)
+        if retry_after:
+            server.count('rate_limited', method)
+            self._send(429, {'ok': False, 'error': 'ratelimited'}, {'Retry-After': str(retry_after)})
+            return
+
+        if not self.headers.get('Authorization', '').startswith('Bearer '):
+            self._send(200, {'ok': False, 'error': 'not_authed'})
+            return
+
+        handler = getattr(self, 'api_' + method.replace('.', '_'), None)
+        if handler is None:
+            self._send(200, {'ok': False, 'error': 'unknown_method'})
+            return
+        self._send(200, handler(server.workspace, params))
+
+    def _send(self, status, data, headers=None):
+        body = json.dumps(data).encode('utf-8')
+        encoding = None
+        if len(body) >= GZIP_MIN_BYTES and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body, compresslevel=1)
+            encoding = 'gzip'
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    # --- API methods ---
+
+    def api_conversations_list(self, workspace, params):
+        types = set((params.get('types') or 'public_channel').split(','))
+        exclude_archived = str(params.get('exclude_archived', '')).lower() in ('true', '1')
+        channels = [
+            c for c in workspace.channels
+            if ('private_channel' if c['is_private'] else 'public_channel') in types
+            and not (exclude_archived and c['is_archived'])
+        ]
+        page = _page(channels, params, 100, 1000)
+        if page is None:
+            return {'ok': False, 'error': 'invalid_cursor'}
+        channels, next_cursor = page
+        return {'ok': True, 'channels': [dict(c) for c in channels],
+                'response_metadata': {'next_cursor': next_cursor}}
+
+    def api_conversations_history(self, workspace, params):
+        channel = workspace.channels_by_id.get(params.get('channel'))
+        if not channel:
+            return {'ok': False, 'error': 'channel_not_found'}
+        if not channel['is_member']:
+            return {'ok': False, 'error': 'not_in_channel'}
+        messages = workspace.messages(channel['id'])
+        oldest = float(params.get('oldest') or 0)
+        latest = float(params.get('latest') or 'inf')
+        if oldest or latest != float('inf'):
+            messages = [m for m in messages if oldest < float(m['ts']) <= latest]
+        page = _page(messages, params, 100, 999)
+        if page is None:
+            return {'ok': False, 'error': 'invalid_cursor'}
+        messages, next_cursor = page
+        return {'ok': True, 'messages': messages, 'has_more': bool(next_cursor),
+                'response_metadata': {'next_cursor': next_cursor}}
+
+    def api_conversations_members(self, workspace, params):
+        channel = workspace.channels_by_id.get(params.get('channel'))
+        if not channel:
+            return {'ok': False, 'error': 'channel_not_found'}
+        page = _page(workspace.members(channel['id']), params, 100, 1000)
+        if page is None:
+            return {'ok': False, 'error': 'invalid_cursor'}
+        members, next_cursor = page
+        return {'ok': True, 'members': members, 'response_metadata': {'next_cursor': next_cursor}}
+
+    def api_conversations_join(self, workspace, params):
+        channel = workspace.channels_by_id.get(params.get('channel'))
+        if not channel:
+            return {'ok': False, 'error': 'channel_not_found'}
+        if channel['is_private']:
+            return {'ok': False, 'error': 'method_not_supported_for_channel_type'}
+        return {'ok': True, 'channel': workspace.join(channel['id'])}
+
+    def api_users_lookupByEmail(self, workspace, params):
+        user = workspace.users_by_email.get(params.get('email', ''))
+        if not user:
+            return {'ok': False, 'error': 'users_not_found'}
+        return {'ok': True, 'user': {'id': user['id'], 'profile': {'email': user['email']}}}
+
+
+class FakeSlackServer(ThreadingHTTPServer):
+    """Serves a `Workspace` on 127.0.0.1 and counts calls per method."""
+
+    daemon_threads = True
+
+    def __init__(self, workspace, port=0, latency_ms=0, jitter_ms=0, rate_scale=1.0, throttle_every=0):
+        super().__init__(('127.0.0.1', port), FakeSlackHandler)
+        self.workspace = workspace
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.limiter = MethodLimiter(rate_scale)
+        self.throttle_every = throttle_every
+        self.stats = {'calls': Counter(), 'rate_limited': Counter()}
+        self._stats_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}/api/'
+
+    def count(self, kind, method):
+        with self._stats_lock:
+            self.stats[kind][method] += 1
+
+    def throttle(self, method):
+        """Returns Retry-After seconds if this call should get a 429, else 0."""
+        if self.throttle_every and sum(self.stats['calls'].values()) % self.throttle_every == 0:
+            return 1
+        return self.limiter.allow(method)
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self.stats = {'calls': Counter(), 'rate_limited': Counter()}
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def parse_args():
+    """Parses command-line arguments."""
+    parser = argparse.ArgumentParser(description="Serve a synthetic Slack workspace for local testing.")
+    parser.add_argument('--channels', type=int, default=1000, help="Number of channels (default: 1000)")
+    parser.add_argument('--users', type=int, help="Number of users (default: max(200, channels / 2))")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for the generated workspace (default: 0)")
+    parser.add_argument('--port', type=int, default=8099, help="Port to listen on (default: 8099)")
+    parser.add_argument('--latency-ms', type=float, default=0, help="Delay added to every response")
+    parser.add_argument('--jitter-ms', type=float, default=0, help="Random extra delay, up to this much")
+    parser.add_argument('--rate-scale', type=float, default=1.0,
+                        help="Multiply every method's rate tier by this (match SLACK_RATE_SCALE)")
+    parser.add_argument('--throttle-every', type=int, default=0, help="Answer every Nth call with a 429")
+    return parser.parse_args()
+
+
+def main():
+    """Main execution function."""
+    args = parse_args()
+    workspace = Workspace(args.channels, args.users, args.seed)
+    server = FakeSlackServer(workspace, args.port, args.latency_ms, args.jitter_ms,
+                             args.rate_scale, args.throttle_every)
+    print(f"Serving {len(workspace.channels)} channels and {len(workspace.users)} users at {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print("\nCalls:", dict(server.stats['calls']))
+        print("Rate limited:", dict(server.stats['rate_limited']))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,42 +3,70 @@
 # requires-python = ">=3.11"
 # dependencies = ["rich>=13.0.0"]
 # ///
-"""Pull all git repos in ~/_apps directory with progress display."""
+"""Pull all git repos in ~/_apps directory with progress display.
 
-import subprocess
+A thin front-end over workspace_sync.SyncPipeline: each repo's upstream is
+checked with a lightweight `git ls-remote`, fetched only if it moved
+(--jobs at a time) and then fast-forwarded on a separate local pool. Status
+lines are printed as each repo finishes, so they appear in completion order.
+"""
+
+import argparse
 from pathlib import Path
 
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn
 
+from workspace_sync import (
+    DEFAULT_FETCH_JOBS,
+    DEFAULT_LOCAL_JOBS,
+    UP_TO_DATE,
+    UPDATED,
+    RepoResult,
+    SyncPipeline,
+    discover_local_repos,
+)
+
 console = Console()
 
 
-def find_git_repos(base_path: Path) -> list[Path]:
-    """Find all directories containing a .git folder."""
-    return sorted(p.parent for p in base_path.glob("*/.git") if p.is_dir())
+def report_result(result: RepoResult) -> None:
+    """Print the status line for a finished repo."""
+    name = result.spec.name
+    if result.status == UP_TO_DATE:
+        console.print(f"  [dim]{name}: up to date[/dim]")
+    elif result.status == UPDATED:
+        console.print(f"  [green]{name}: {result.message}[/green]")
+    else:
+        console.print(f"  [red]{name}: {result.message}[/red]")
 
 
-def git_pull(repo_path: Path) -> tuple[bool, str]:
-    """Run git pull in a repo, return (success, output)."""
-    result = subprocess.run(
-        ["git", "pull"],
-        cwd=repo_path,
-        capture_output=True,
-        text=True,
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=DEFAULT_FETCH_JOBS,
+        help=f"number of repos to fetch at once (default: {DEFAULT_FETCH_JOBS})",
+    )
+    parser.add_argument(
+        "--local-jobs", type=int, default=DEFAULT_LOCAL_JOBS,
+        help=f"number of concurrent fast-forwards (default: {DEFAULT_LOCAL_JOBS})",
     )
-    output = result.stdout.strip() or result.stderr.strip()
-    return result.returncode == 0, output
+    parser.add_argument(
+        "--all", action="store_true",
+        help="fetch every repo without checking upstream for changes first",
+    )
+    return parser.parse_args()
 
 
 def main():
+    args = parse_args()
     base_path = Path.home() / "_apps"
 
     if not base_path.exists():
         console.print(f"[red]Directory not found: {base_path}[/red]")
         return
 
-    repos = find_git_repos(base_path)
+    repos = list(discover_local_repos(base_path))
 
     if not repos:
         console.print("[yellow]No git repositories found.[/yellow]")
@@ -46,6 +74,12 @@ def main():
 
     console.print(f"Found [cyan]{len(repos)}[/cyan] repositories\n")
 
+    pipeline = SyncPipeline(
+        fetch_jobs=args.jobs,
+        local_jobs=args.local_jobs,
+        check_upstream=not args.all,
+    )
+
     with Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
@@ -53,22 +87,15 @@ def main():
         TaskProgressColumn(),
         console=console,
     ) as progress:
-        task = progress.add_task("Pulling repos...", total=len(repos))
-
-        for repo in repos:
-            progress.update(task, description=f"Pulling [cyan]{repo.name}[/cyan]")
-            success, output = git_pull(repo)
-
-            if success:
-                if "Already up to date" in output:
-                    console.print(f"  [dim]{repo.name}: up to date[/dim]")
-                else:
-                    console.print(f"  [green]{repo.name}: {output}[/green]")
-            else:
-                console.print(f"  [red]{repo.name}: {output}[/red]")
+        task = progress.add_task(f"Pulling repos ({args.jobs} at a time)...", total=len(repos))
 
+        def on_result(result: RepoResult) -> None:
+            report_result(result)
+            progress.update(task, description=f"Pulled [cyan]{result.spec.name}[/cyan]")
             progress.advance(task)
 
+        pipeline.run(repos, on_result)
+
     console.print("\n[green]Done![/green]")
 
 
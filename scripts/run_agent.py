@@ -1,36 +1,148 @@
 #!/usr/bin/env python3
 """
-Run a Claude agent with a prompt file against a batch file.
+Run a Claude agent with a prompt file against one or more batch files.
 
-Usage: python run_agent.py <prompt_file> <batch_file>
+Usage: python run_agent.py [-j JOBS] [--force] <prompt_file> <batch> [<batch> ...]
+
+Each <batch> is a batch file, a directory of batch_*.json files or a glob.
+A single batch file named on its own is always run. Otherwise, batches
+whose batch_result_XX.json already exists are skipped (unless --force) and
+the rest run as concurrent agent sessions, --jobs at a time. A failed
+session never deletes an earlier result unless --force was given.
+
+Messages are streamed to .github/new_owner/batch_XX.jsonl as they arrive
+and batch_result_XX.json is built from that log when the session succeeds;
+a session ending in an error result gets none, so the next run retries it.
+A batch interrupted part-way (crash, timeout, Ctrl-C) resumes its SDK
+session on the next run; --force starts it over.
+
+Every session is appended to .github/new_owner/runs.jsonl with its
+telemetry (time to first message, per-tool call counts and latency, duration,
+cost); shard_batches.py uses it to size batches and agent_metrics.py
+compares prompt files on it. With --reshard, batches that fail are
+split by shard_batches.py and the pieces run in a further round.
 
 Example:
     python run_agent.py ~/.claude/prompts/codeowners-test-verifier.md .github/unowned-batches/batch_01.json
+    python run_agent.py -j 4 --reshard ~/.claude/prompts/codeowners-test-verifier.md .github/unowned-batches/
 """
+import argparse
 import asyncio
+import glob
 import json
 import sys
+import time
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, AsyncIterator, Callable
 
+from agent_log import BatchLog, finalize, log_path, log_state
+from agent_metrics import session_metrics
+from shard_batches import RESHARDED_SUFFIX, RESULT_FILE, RUN_LOG, Budget, load_runs, reshard
 from claude_agent_sdk import (
     query,
     ClaudeAgentOptions,
     AssistantMessage,
+    SystemMessage,
     TextBlock,
+    ToolResultBlock,
     ToolUseBlock,
     ResultMessage,
+    UserMessage,
 )
 
+OUTPUT_DIR = Path(".github/new_owner")
+
+DEFAULT_JOBS = 4
+
+# Rounds of splitting and re-running failed batches with --reshard
+MAX_RESHARD_ROUNDS = 3
+
+# Signature of `claude_agent_sdk.query`; tests can pass a fake in its place.
+QueryFn = Callable[..., AsyncIterator[Any]]
+
+
+@dataclass
+class BatchOutcome:
+    batch: int
+    files: int
+    # "done", "skipped" or "failed"
+    status: str
+    duration_ms: int | None = None
+    total_cost_usd: float | None = None
+    wall_seconds: float = 0.0
+    error: str = ""
+
+
+def load_batch(batch_file: Path) -> dict:
+    return json.loads(batch_file.read_text())
+
+
+def result_path(batch_num: int) -> Path:
+    return OUTPUT_DIR / RESULT_FILE.format(batch_num)
+
+
+def record_run(outcome: BatchOutcome, files: list[str], prompt_file: str) -> None:
+    """Append a session and its telemetry to the run log.
+
+    shard_batches.py learns batch costs from it and agent_metrics.py reports on it.
+    """
+    transcript = log_path(OUTPUT_DIR, outcome.batch)
+    metrics = session_metrics(transcript) if transcript.exists() else {}
+    RUN_LOG.parent.mkdir(parents=True, exist_ok=True)
+    with RUN_LOG.open("a") as f:
+        f.write(json.dumps({
+            "batch": outcome.batch,
+            "prompt": Path(prompt_file).name,
+            "status": outcome.status,
+            "files": files,
+            "duration_ms": outcome.duration_ms,
+            "wall_ms": round(outcome.wall_seconds * 1000),
+            "total_cost_usd": outcome.total_cost_usd,
+            **metrics,
+            "error": outcome.error,
+            "finished_at": time.time(),
+        }) + "\n")
 
-async def run(prompt_file: str, batch_file: str) -> None:
-    """Run agent with prompt against batch of files."""
+
+def resolve_batch_files(patterns: list[str]) -> list[Path]:
+    """Expand files, directories (batch_*.json inside) and globs, in order, without duplicates.
+
+    Batch files replaced by resharding (*.json.resharded) are never returned.
+    """
+    found: dict[Path, None] = {}
+    for pattern in patterns:
+        path = Path(pattern).expanduser()
+        if path.is_dir():
+            matches = sorted(path.glob("batch_*.json"))
+        elif path.is_file():
+            matches = [path]
+        else:
+            matches = sorted(Path(p) for p in glob.glob(str(path)))
+        for match in matches:
+            if match.suffix != RESHARDED_SUFFIX:
+                found.setdefault(match.resolve(), None)
+    return list(found)
+
+
+async def run(
+    prompt_file: str,
+    batch_file: str,
+    query_fn: QueryFn = query,
+    label: str = "",
+    fresh: bool = False,
+) -> BatchOutcome:
+    """Run agent with prompt against batch of files.
+
+    An interrupted session for the same files is resumed unless `fresh`.
+    `label` prefixes every printed line, so concurrent sessions can be told apart.
+    """
     # Load system prompt
     prompt_path = Path(prompt_file).expanduser()
     system_prompt = prompt_path.read_text()
 
     # Load batch
-    batch_path = Path(batch_file)
-    batch = json.loads(batch_path.read_text())
+    batch = load_batch(Path(batch_file))
     files = batch["files"]
     batch_num = batch["batch"]
 
@@ -39,66 +151,284 @@ async def run(prompt_file: str, batch_file: str) -> None:
     task = f"Process batch {batch_num} with {len(files)} files:\n\n{files_list}"
 
     # Output directory
-    output_dir = Path(".github/new_owner")
-    output_dir.mkdir(parents=True, exist_ok=True)
-    output_file = output_dir / f"batch_result_{batch_num:02d}.json"
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    output_file = result_path(batch_num)
+    transcript = log_path(OUTPUT_DIR, batch_num)
+
+    def say(text: str) -> None:
+        print("\n".join(f"{label}{line}" for line in text.split("\n")))
 
-    print(f"Processing batch {batch_num} ({len(files)} files)...")
+    state = log_state(transcript)
+    resume = not fresh and state.files == files and not state.complete and state.session_id
 
     options = ClaudeAgentOptions(
         system_prompt=system_prompt,
         allowed_tools=["Read", "Grep", "Glob", "Write"],
         permission_mode="acceptEdits",
         cwd=str(Path.cwd()),
+        resume=state.session_id if resume else None,
     )
 
-    collected_text = []
-
-    async for message in query(prompt=task, options=options):
-        if isinstance(message, AssistantMessage):
-            for block in message.content:
-                if isinstance(block, TextBlock):
-                    collected_text.append(block.text)
-                    print(block.text)
-                elif isinstance(block, ToolUseBlock):
-                    print(f"[{block.name}] {block.input}")
-
-        elif isinstance(message, ResultMessage):
-            print(f"\nBatch {batch_num} complete in {message.duration_ms}ms")
-            if message.total_cost_usd:
-                print(f"Cost: ${message.total_cost_usd:.4f}")
-
-    # Write results
-    result = {
-        "batch": batch_num,
-        "files_processed": len(files),
-        "files": files,
-        "output": "\n".join(collected_text),
-    }
-    output_file.write_text(json.dumps(result, indent=2))
-    print(f"Results written to {output_file}")
+    if resume:
+        task = (
+            f"Continue processing batch {batch_num}. The previous session was interrupted;"
+            " check what has already been written and pick up where it left off."
+        )
+        say(f"Resuming batch {batch_num} ({len(files)} files) from session {state.session_id}...")
+    else:
+        say(f"Processing batch {batch_num} ({len(files)} files)...")
 
+    outcome = BatchOutcome(batch_num, len(files), "done")
+    started = time.monotonic()
 
-def main() -> None:
-    if len(sys.argv) != 3:
-        print("Usage: python run_agent.py <prompt_file> <batch_file>")
-        print("\nExample:")
-        print("  python run_agent.py ~/.claude/prompts/test-verifier.md .github/unowned-batches/batch_01.json")
-        sys.exit(1)
+    with BatchLog(transcript, fresh=not resume) as log:
+        if resume:
+            log.write("resume", session_id=state.session_id, started_at=time.time())
+        else:
+            log.write("start", batch=batch_num, files=files, started_at=time.time())
+
+        try:
+            async for message in query_fn(prompt=task, options=options):
+                if isinstance(message, AssistantMessage):
+                    for block in message.content:
+                        if isinstance(block, TextBlock):
+                            log.write("text", text=block.text)
+                            say(block.text)
+                        elif isinstance(block, ToolUseBlock):
+                            log.write("tool_use", id=block.id, name=block.name, input=block.input)
+                            say(f"[{block.name}] {block.input}")
+
+                elif isinstance(message, UserMessage) and isinstance(message.content, list):
+                    for block in message.content:
+                        if isinstance(block, ToolResultBlock):
+                            log.write("tool_result", tool_use_id=block.tool_use_id, is_error=bool(block.is_error))
+
+                elif isinstance(message, SystemMessage):
+                    if message.subtype == "init" and message.data.get("session_id"):
+                        log.write("session", session_id=message.data["session_id"])
+
+                elif isinstance(message, ResultMessage):
+                    log.write(
+                        "result",
+                        session_id=message.session_id,
+                        subtype=message.subtype,
+                        is_error=message.is_error,
+                        num_turns=message.num_turns,
+                        duration_ms=message.duration_ms,
+                        duration_api_ms=message.duration_api_ms,
+                        total_cost_usd=message.total_cost_usd,
+                    )
+                    outcome.duration_ms = message.duration_ms
+                    outcome.total_cost_usd = message.total_cost_usd
+                    if message.is_error:
+                        outcome.status = "failed"
+                        outcome.error = f"{message.subtype} result"
+                        say(f"\nBatch {batch_num} failed ({message.subtype}) after {message.duration_ms}ms")
+                    else:
+                        say(f"\nBatch {batch_num} complete in {message.duration_ms}ms")
+                    if message.total_cost_usd:
+                        say(f"Cost: ${message.total_cost_usd:.4f}")
+        except BaseException as e:
+            log.write("error", error=str(e) or type(e).__name__)
+            raise
+
+    outcome.wall_seconds = time.monotonic() - started
+    record_run(outcome, files, prompt_file)
+
+    # Only a successful session gets a result file; its absence is what makes later runs retry a batch
+    if outcome.status == "done":
+        output_file.write_text(json.dumps(finalize(transcript), indent=2))
+        say(f"Results written to {output_file}")
+    elif fresh:
+        # A result left by an earlier run (before --force) would otherwise mark this batch finished
+        output_file.unlink(missing_ok=True)
+        say(f"No results written for batch {batch_num}; it will be retried on the next run")
+    elif output_file.exists():
+        say(f"No results written for batch {batch_num}; keeping the earlier {output_file}")
+    else:
+        say(f"No results written for batch {batch_num}; it will be retried on the next run")
+    return outcome
 
-    prompt_file = sys.argv[1]
-    batch_file = sys.argv[2]
+
+async def run_many(
+    prompt_file: str,
+    batch_files: list[Path],
+    jobs: int = DEFAULT_JOBS,
+    force: bool = False,
+    query_fn: QueryFn = query,
+) -> list[BatchOutcome]:
+    """Run every batch not yet processed, `jobs` agent sessions at a time.
+
+    A failing session is recorded as "failed" and does not stop the others.
+    """
+    semaphore = asyncio.Semaphore(max(1, jobs))
+    outcomes = []
+    pending = []
+
+    for batch_file in batch_files:
+        batch = load_batch(batch_file)
+        if not force and result_path(batch["batch"]).exists():
+            print(f"Skipping batch {batch['batch']}: {result_path(batch['batch'])} exists")
+            outcomes.append(BatchOutcome(batch["batch"], len(batch["files"]), "skipped"))
+        else:
+            pending.append((batch_file, batch))
+
+    async def run_one(batch_file: Path, batch: dict) -> BatchOutcome:
+        async with semaphore:
+            started = time.monotonic()
+            try:
+                return await run(
+                    prompt_file, str(batch_file), query_fn,
+                    label=f"[batch {batch['batch']:02d}] ", fresh=force,
+                )
+            except Exception as e:
+                print(f"[batch {batch['batch']:02d}] Failed: {e}", file=sys.stderr)
+                outcome = BatchOutcome(
+                    batch["batch"], len(batch["files"]), "failed",
+                    wall_seconds=time.monotonic() - started, error=str(e),
+                )
+                record_run(outcome, batch["files"], prompt_file)
+                return outcome
+
+    outcomes += await asyncio.gather(*(run_one(f, b) for f, b in pending))
+    return sorted(outcomes, key=lambda o: o.batch)
+
+
+async def run_with_resharding(
+    prompt_file: str,
+    batch_files: list[Path],
+    jobs: int = DEFAULT_JOBS,
+    force: bool = False,
+    root: Path | None = None,
+    query_fn: QueryFn = query,
+) -> list[BatchOutcome]:
+    """Like run_many, but failed batches are split and re-run, up to MAX_RESHARD_ROUNDS times.
+
+    Outcomes of batches that were split are replaced by those of their pieces.
+    """
+    root = root or Path.cwd()
+    outcomes = await run_many(prompt_file, batch_files, jobs, force, query_fn)
+    for _ in range(MAX_RESHARD_ROUNDS):
+        numbers = {path: load_batch(path)["batch"] for path in batch_files}
+        failed = {o.batch for o in outcomes if o.status == "failed"}
+        batch_dirs = sorted({path.parent for path, number in numbers.items() if number in failed})
+        if not batch_dirs:
+            break
+        # Only this round's failures: skipped batches are finished, other pending ones are not ours to split
+        new_files = [
+            path for batch_dir in batch_dirs
+            for path in reshard(root, batch_dir, Budget(), load_runs(), OUTPUT_DIR, only=failed)
+        ]
+        if not new_files:
+            break
+
+        # reshard() renames the batch files it split
+        split = {number for path, number in numbers.items() if not path.exists()}
+        batch_files = [path for path in batch_files if path.exists()] + new_files
+        print(f"\nRe-running {len(new_files)} resharded batches...")
+        outcomes = [o for o in outcomes if o.batch not in split]
+        outcomes += await run_many(prompt_file, new_files, jobs, force, query_fn)
+    return sorted(outcomes, key=lambda o: o.batch)
+
+
+def print_summary(outcomes: list[BatchOutcome], wall_seconds: float) -> None:
+    done = [o for o in outcomes if o.status == "done"]
+    failed = [o for o in outcomes if o.status == "failed"]
+    skipped = [o for o in outcomes if o.status == "skipped"]
+
+    print("\n" + "=" * 60)
+    print(f"{'Batch':>5}  {'Status':<8} {'Files':>5} {'Duration':>10} {'Cost':>9}")
+    for o in outcomes:
+        duration = f"{o.duration_ms / 1000:.1f}s" if o.duration_ms is not None else "-"
+        cost = f"${o.total_cost_usd:.4f}" if o.total_cost_usd is not None else "-"
+        print(f"{o.batch:>5}  {o.status:<8} {o.files:>5} {duration:>10} {cost:>9}")
+
+    agent_seconds = sum(o.duration_ms or 0 for o in done) / 1000
+    total_cost = sum(o.total_cost_usd or 0 for o in done)
+    files = sum(o.files for o in done)
+    print("-" * 60)
+    print(f"Batches: {len(done)} done, {len(skipped)} skipped, {len(failed)} failed")
+    print(f"Files processed: {files}")
+    print(f"Agent time: {agent_seconds:.1f}s (wall clock {wall_seconds:.1f}s)")
+    print(f"Total cost: ${total_cost:.4f}")
+    for o in failed:
+        print(f"  batch {o.batch}: {o.error}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Run a Claude agent with a prompt file against one or more batch files.",
+    )
+    parser.add_argument("prompt_file", help="system prompt file")
+    parser.add_argument(
+        "batches", nargs="+",
+        help="batch file, directory of batch_*.json files or glob (repeatable)",
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=DEFAULT_JOBS,
+        help=f"number of agent sessions to run at once (default: {DEFAULT_JOBS})",
+    )
+    parser.add_argument(
+        "--force", action="store_true",
+        help="re-run batches whose batch_result_XX.json already exists",
+    )
+    parser.add_argument(
+        "--finalize", action="store_true",
+        help="only rebuild batch_result_XX.json from each batch's JSONL log, including interrupted ones (later runs then skip them)",
+    )
+    parser.add_argument(
+        "--reshard", action="store_true",
+        help=f"split failed batches with shard_batches.py and re-run them (up to {MAX_RESHARD_ROUNDS} rounds)",
+    )
+    parser.add_argument(
+        "--root", type=Path, default=Path.cwd(),
+        help="repo the batch file paths are relative to, for --reshard size estimates (default: cwd)",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
 
     # Validate files exist
-    if not Path(prompt_file).expanduser().exists():
-        print(f"Error: Prompt file not found: {prompt_file}")
+    if not Path(args.prompt_file).expanduser().exists():
+        print(f"Error: Prompt file not found: {args.prompt_file}")
         sys.exit(1)
 
-    if not Path(batch_file).exists():
-        print(f"Error: Batch file not found: {batch_file}")
+    batch_files = resolve_batch_files(args.batches)
+    if not batch_files:
+        print(f"Error: No batch files found: {' '.join(args.batches)}")
         sys.exit(1)
 
-    asyncio.run(run(prompt_file, batch_file))
+    if args.finalize:
+        for batch_file in batch_files:
+            batch_num = load_batch(batch_file)["batch"]
+            transcript = log_path(OUTPUT_DIR, batch_num)
+            if not transcript.exists():
+                print(f"Skipping batch {batch_num}: no log at {transcript}")
+                continue
+            partial = "" if log_state(transcript).complete else " (interrupted)"
+            result_path(batch_num).write_text(json.dumps(finalize(transcript), indent=2))
+            print(f"Batch {batch_num}{partial}: results written to {result_path(batch_num)}")
+        return
+
+    # A single batch file named on its own runs as before: always, with
+    # unprefixed output and no summary. Directories and globs skip finished batches.
+    explicit_file = len(args.batches) == 1 and Path(args.batches[0]).expanduser().is_file()
+    if explicit_file and not args.reshard:
+        asyncio.run(run(args.prompt_file, str(batch_files[0]), fresh=args.force))
+        return
+
+    started = time.monotonic()
+    if args.reshard:
+        outcomes = asyncio.run(run_with_resharding(
+            args.prompt_file, batch_files, args.jobs, args.force, args.root.expanduser(),
+        ))
+    else:
+        outcomes = asyncio.run(run_many(args.prompt_file, batch_files, args.jobs, args.force))
+    print_summary(outcomes, time.monotonic() - started)
+    if any(o.status == "failed" for o in outcomes):
+        sys.exit(1)
 
 
 if __name__ == "__main__":
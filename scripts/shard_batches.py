@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Split a CODEOWNERS file list into agent batches by estimated cost.
+
+Usage:
+    python shard_batches.py shard [--codeowners FILE --owner OWNER] [<file_list> ...]
+    python shard_batches.py reshard
+
+Instead of a fixed 50 files per batch, each file's cost is estimated from its
+line count, using per-file and per-line durations fitted to past sessions
+(`duration_ms` and `total_cost_usd` of each `ResultMessage`, which
+run_agent.py appends to .github/new_owner/runs.jsonl). Batches are filled up
+to a target session length, a context budget (file bytes / 4 tokens) and a
+file cap, whichever is hit first.
+
+`reshard` splits batches that failed on their last run, or that have not run
+yet but exceed the current budgets, into smaller ones with new batch numbers.
+Batches that already have a batch_result_XX.json are never split. The
+replaced batch files are renamed to *.json.resharded so directory and glob
+runs no longer pick them up. run_agent.py --reshard does this between rounds
+automatically, for the batches that failed in that round only.
+
+Example:
+    git ls-files test/ | python shard_batches.py shard --root ~/_apps/app-shedul-umbrella
+    python shard_batches.py shard --codeowners .github/CODEOWNERS --owner @surgeventures/team-x
+"""
+import argparse
+import json
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+BATCH_DIR = Path(".github/unowned-batches")
+RUN_LOG = Path(".github/new_owner/runs.jsonl")
+# run_agent.py writes a batch's results next to the run log once it succeeds
+RESULT_FILE = "batch_result_{:02d}.json"
+
+DEFAULT_TARGET_MINUTES = 10
+DEFAULT_MAX_TOKENS = 120_000
+DEFAULT_MAX_FILES = 100
+
+# Rough source-code density; only used to keep batches inside the context window
+BYTES_PER_TOKEN = 4
+
+# Starting estimates until runs.jsonl has enough history to fit them
+DEFAULT_MS_PER_FILE = 12_000.0
+DEFAULT_MS_PER_LINE = 15.0
+DEFAULT_USD_PER_FILE = 0.02
+DEFAULT_USD_PER_LINE = 0.00002
+
+RESHARDED_SUFFIX = ".resharded"
+
+
+@dataclass
+class FileStat:
+    path: str
+    size: int
+    lines: int
+
+    @property
+    def tokens(self) -> int:
+        return self.size // BYTES_PER_TOKEN
+
+
+@dataclass
+class CostModel:
+    """Linear estimate of a session's duration and cost from its file and line counts."""
+
+    ms_per_file: float = DEFAULT_MS_PER_FILE
+    ms_per_line: float = DEFAULT_MS_PER_LINE
+    usd_per_file: float = DEFAULT_USD_PER_FILE
+    usd_per_line: float = DEFAULT_USD_PER_LINE
+    samples: int = 0
+
+    def estimate_ms(self, files: int, lines: int) -> float:
+        return self.ms_per_file * files + self.ms_per_line * lines
+
+    def estimate_usd(self, files: int, lines: int) -> float:
+        return self.usd_per_file * files + self.usd_per_line * lines
+
+    @classmethod
+    def fit(cls, samples: list[tuple[int, int, float, float]]) -> "CostModel":
+        """Fit to (files, lines, duration_ms, cost_usd) of past successful sessions."""
+        model = cls(samples=len(samples))
+        if samples:
+            model.ms_per_file, model.ms_per_line = _fit_pair(
+                [(n, lines, ms) for n, lines, ms, _ in samples], DEFAULT_MS_PER_FILE, DEFAULT_MS_PER_LINE,
+            )
+            model.usd_per_file, model.usd_per_line = _fit_pair(
+                [(n, lines, usd) for n, lines, _, usd in samples], DEFAULT_USD_PER_FILE, DEFAULT_USD_PER_LINE,
+            )
+        return model
+
+
+def _fit_pair(points: list[tuple[int, int, float]], per_file: float, per_line: float) -> tuple[float, float]:
+    """Least-squares fit of y = a * files + b * lines.
+
+    Falls back to rescaling the defaults when there are too few or too similar
+    sessions for both coefficients, or the fit comes out negative.
+    """
+    snn = sum(n * n for n, _, _ in points)
+    snl = sum(n * lines for n, lines, _ in points)
+    sll = sum(lines * lines for _, lines, _ in points)
+    sny = sum(n * y for n, _, y in points)
+    sly = sum(lines * y for _, lines, y in points)
+    det = snn * sll - snl * snl
+    if len(points) >= 3 and det > 1e-9 * snn * sll:
+        a = (sny * sll - sly * snl) / det
+        b = (sly * snn - sny * snl) / det
+        if a > 0 and b > 0:
+            return a, b
+
+    predicted = sum(per_file * n + per_line * lines for n, lines, _ in points)
+    actual = sum(y for _, _, y in points)
+    scale = actual / predicted if predicted > 0 and actual > 0 else 1.0
+    return per_file * scale, per_line * scale
+
+
+def stat_files(paths: list[str], root: Path) -> list[FileStat]:
+    """Size and line count of each file under `root`; missing files count as empty."""
+    stats = []
+    for path in paths:
+        try:
+            data = (root / path).read_bytes()
+        except OSError:
+            data = b""
+        stats.append(FileStat(path, len(data), data.count(b"\n")))
+    return stats
+
+
+def load_runs(path: Path = RUN_LOG) -> list[dict]:
+    """Every session record in the run log, oldest first; torn lines are skipped."""
+    if not path.exists():
+        return []
+    runs = []
+    for line in path.read_text().splitlines():
+        try:
+            runs.append(json.loads(line))
+        except ValueError:
+            pass
+    return runs
+
+
+def fit_model(runs: list[dict], root: Path) -> CostModel:
+    samples = []
+    for run in runs:
+        if run.get("status") == "done" and run.get("duration_ms"):
+            stats = stat_files(run["files"], root)
+            samples.append((
+                len(stats), sum(s.lines for s in stats),
+                float(run["duration_ms"]), float(run.get("total_cost_usd") or 0),
+            ))
+    return CostModel.fit(samples)
+
+
+@dataclass
+class Budget:
+    max_ms: float = DEFAULT_TARGET_MINUTES * 60_000
+    max_tokens: int = DEFAULT_MAX_TOKENS
+    max_files: int = DEFAULT_MAX_FILES
+
+    def fits(self, model: CostModel, files: list[FileStat]) -> bool:
+        return (
+            len(files) <= self.max_files
+            and sum(f.tokens for f in files) <= self.max_tokens
+            and model.estimate_ms(len(files), sum(f.lines for f in files)) <= self.max_ms
+        )
+
+
+def pack(files: list[FileStat], model: CostModel, budget: Budget) -> list[list[FileStat]]:
+    """Greedily fill batches in path order, so files from one directory stay together.
+
+    A single file over budget still gets a batch of its own.
+    """
+    batches: list[list[FileStat]] = []
+    current: list[FileStat] = []
+    for stat in sorted(files, key=lambda f: f.path):
+        if current and not budget.fits(model, current + [stat]):
+            batches.append(current)
+            current = []
+        current.append(stat)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def batch_files(batch_dir: Path) -> list[Path]:
+    return sorted(batch_dir.glob("batch_*.json"))
+
+
+def next_batch_number(batch_dir: Path) -> int:
+    numbers = [
+        json.loads(path.read_text())["batch"]
+        for path in batch_dir.glob("batch_*.json*")
+    ]
+    return max(numbers, default=0) + 1
+
+
+def write_batches(
+    batches: list[list[FileStat]], batch_dir: Path, first: int, model: CostModel,
+) -> list[Path]:
+    batch_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+    for number, files in enumerate(batches, start=first):
+        lines = sum(f.lines for f in files)
+        path = batch_dir / f"batch_{number:02d}.json"
+        path.write_text(json.dumps({
+            "batch": number,
+            "files": [f.path for f in files],
+            "estimated_ms": round(model.estimate_ms(len(files), lines)),
+            "estimated_tokens": sum(f.tokens for f in files),
+        }, indent=2))
+        written.append(path)
+    return written
+
+
+def print_plan(batches: list[list[FileStat]], model: CostModel) -> None:
+    files = sum(len(b) for b in batches)
+    lines = sum(f.lines for b in batches for f in b)
+    minutes = model.estimate_ms(files, lines) / 60_000
+    source = f"fitted to {model.samples} past sessions" if model.samples else "default estimates"
+    print(f"{files} files in {len(batches)} batches ({source})")
+    if batches:
+        print(f"  sizes: {min(len(b) for b in batches)}-{max(len(b) for b in batches)} files per batch")
+    print(f"  estimated agent time: {minutes:.0f} min, cost: ${model.estimate_usd(files, lines):.2f}")
+
+
+def files_from_codeowners(codeowners: Path, owner: str, root: Path) -> list[str]:
+    """Entries owned by `owner` that name a single existing file (not a pattern or directory)."""
+    paths = []
+    for line in codeowners.read_text().splitlines():
+        parts = line.split("#", 1)[0].split()
+        if len(parts) < 2 or owner not in parts[1:]:
+            continue
+        path = parts[0].lstrip("/")
+        if (root / path).is_file():
+            paths.append(path)
+    return paths
+
+
+def shard(paths: list[str], root: Path, batch_dir: Path, budget: Budget, runs: list[dict]) -> list[Path]:
+    model = fit_model(runs, root)
+    batches = pack(stat_files(paths, root), model, budget)
+    print_plan(batches, model)
+    return write_batches(batches, batch_dir, 1, model)
+
+
+def reshard(
+    root: Path,
+    batch_dir: Path,
+    budget: Budget,
+    runs: list[dict],
+    results_dir: Path = RUN_LOG.parent,
+    only: set[int] | None = None,
+) -> list[Path]:
+    """Split failed and over-budget batches. Returns the new batch files.
+
+    Batches with a result file in `results_dir` are finished and left alone.
+    With `only`, every other batch number is left alone too.
+    """
+    model = fit_model(runs, root)
+    # Batch numbers are reused after `shard --force`, so match on the file list too
+    last_run = {(run["batch"], tuple(run["files"])): run for run in runs}
+    first = next_batch_number(batch_dir)
+    written = []
+
+    for path in batch_files(batch_dir):
+        batch = json.loads(path.read_text())
+        if only is not None and batch["batch"] not in only:
+            continue
+        if (results_dir / RESULT_FILE.format(batch["batch"])).exists():
+            continue
+        run = last_run.get((batch["batch"], tuple(batch["files"])))
+        stats = stat_files(batch["files"], root)
+        if run and run.get("status") == "failed":
+            reason = f"failed: {run.get('error') or 'error result'}"
+            # It did not fit even if the estimate says it should; at least halve it
+            total = model.estimate_ms(len(stats), sum(s.lines for s in stats))
+            limit = Budget(
+                min(budget.max_ms, total / 2),
+                min(budget.max_tokens, sum(s.tokens for s in stats) // 2),
+                min(budget.max_files, len(stats) // 2),
+            )
+        elif not run and not budget.fits(model, stats):
+            reason = "over budget"
+            limit = budget
+        else:
+            continue
+
+        if len(stats) < 2:
+            print(f"Batch {batch['batch']} {reason}; a single file cannot be split further", file=sys.stderr)
+            continue
+        pieces = pack(stats, model, limit)
+        new_files = write_batches(pieces, batch_dir, first, model)
+        first += len(pieces)
+        path.rename(path.with_name(path.name + RESHARDED_SUFFIX))
+        numbers = ", ".join(str(json.loads(p.read_text())["batch"]) for p in new_files)
+        print(f"Batch {batch['batch']} {reason} -> batches {numbers}")
+        written += new_files
+
+    return written
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Split a CODEOWNERS file list into agent batches by estimated cost.")
+    parser.add_argument("--root", type=Path, default=Path.cwd(), help="repo the file paths are relative to (default: cwd)")
+    parser.add_argument("--batch-dir", type=Path, default=BATCH_DIR, help=f"where batch files live (default: {BATCH_DIR})")
+    parser.add_argument("--run-log", type=Path, default=RUN_LOG, help=f"session history from run_agent.py (default: {RUN_LOG})")
+    parser.add_argument(
+        "--target-minutes", type=float, default=DEFAULT_TARGET_MINUTES,
+        help=f"estimated agent time per batch (default: {DEFAULT_TARGET_MINUTES})",
+    )
+    parser.add_argument(
+        "--max-tokens", type=int, default=DEFAULT_MAX_TOKENS,
+        help=f"estimated file content tokens per batch (default: {DEFAULT_MAX_TOKENS})",
+    )
+    parser.add_argument(
+        "--max-files", type=int, default=DEFAULT_MAX_FILES,
+        help=f"files per batch (default: {DEFAULT_MAX_FILES})",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    shard_parser = commands.add_parser("shard", help="write a fresh set of batches")
+    shard_parser.add_argument("file_lists", nargs="*", help="files with one path per line (default: stdin)")
+    shard_parser.add_argument("--codeowners", type=Path, help="take files from this CODEOWNERS file instead")
+    shard_parser.add_argument("--owner", help="owner whose CODEOWNERS file entries to take")
+    shard_parser.add_argument("--force", action="store_true", help="replace existing batch files")
+
+    commands.add_parser("reshard", help="split failed and over-budget batches")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    root = args.root.expanduser()
+    budget = Budget(args.target_minutes * 60_000, args.max_tokens, args.max_files)
+    runs = load_runs(args.run_log)
+
+    if args.command == "reshard":
+        written = reshard(root, args.batch_dir, budget, runs, args.run_log.parent)
+        print(f"{len(written)} new batches" if written else "Nothing to reshard")
+        return
+
+    existing = list(args.batch_dir.glob("batch_*.json*"))
+    if existing and not args.force:
+        print(f"Error: {args.batch_dir} already has batch files (use --force to replace them)")
+        sys.exit(1)
+
+    if args.codeowners:
+        if not args.owner:
+            print("Error: --codeowners needs --owner")
+            sys.exit(1)
+        paths = files_from_codeowners(args.codeowners, args.owner, root)
+    elif args.file_lists:
+        paths = [line for name in args.file_lists for line in Path(name).read_text().splitlines()]
+    else:
+        paths = sys.stdin.read().splitlines()
+    paths = list(dict.fromkeys(p.strip() for p in paths if p.strip()))
+
+    if not paths:
+        print("Error: No files to shard")
+        sys.exit(1)
+
+    for path in existing:
+        path.unlink()
+    written = shard(paths, root, args.batch_dir, budget, runs)
+    print(f"Wrote {len(written)} batch files to {args.batch_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+A reusable Slack Web API client with persistent, pooled connections.
+
+`urllib.request.urlopen` opens a new TCP (and TLS) connection for every
+call. `SlackClient` keeps a small pool of keep-alive connections to the API
+host, asks for gzip-compressed responses and decodes JSON straight from the
+response stream. It is safe to share between threads: each call borrows a
+connection from the pool and returns it when the response has been read.
+
+Like `urlopen`, it honours HTTPS_PROXY/HTTP_PROXY and NO_PROXY: HTTPS calls
+are tunnelled through the proxy with CONNECT, plain HTTP calls are sent to
+the proxy with an absolute URL.
+
+Every call is paced by a shared `RateLimiter` (see slack_rate_limit.py).
+"""
+
+import base64
+import gzip
+import http.client
+import json
+import os
+import queue
+import sys
+import threading
+import urllib.parse
+import urllib.request
+
+from slack_rate_limit import RateLimiter
+
+# Point this at a local stand-in server to run without hitting real Slack.
+DEFAULT_BASE_URL = os.environ.get('SLACK_API_URL', 'https://slack.com/api/')
+
+# Idle keep-alive connections kept per client.
+DEFAULT_POOL_SIZE = 16
+
+# Seconds to wait on a socket before giving up on a call.
+DEFAULT_TIMEOUT = 30
+
+MAX_RETRIES = 5
+
+# Errors that mean a pooled keep-alive connection went stale under us.
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    BrokenPipeError,
+    ConnectionResetError,
+)
+
+# One rate limiter per process, shared by every client.
+shared_rate_limiter = RateLimiter()
+
+
+class SlackAPIError(Exception):
+    """Raised by `SlackClient.paginate` when a page cannot be fetched."""
+
+
+class SlackClient:
+    """A thread-safe Slack Web API client backed by a keep-alive connection pool."""
+
+    def __init__(self, token, base_url=DEFAULT_BASE_URL, rate_limiter=None,
+                 pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT):
+        self.token = token
+        self.rate_limiter = rate_limiter or shared_rate_limiter
+        self.timeout = timeout
+        url = urllib.parse.urlsplit(base_url)
+        self._scheme = url.scheme
+        self._host = url.netloc
+        self._path = url.path.rstrip('/') + '/'
+        self._proxy = self._find_proxy(url)
+        if self._proxy and self._scheme != 'https':
+            # A plain HTTP proxy is sent the absolute URL instead of a tunnel
+            self._path = f"{self._scheme}://{self._host}{self._path}"
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+
+    @staticmethod
+    def _find_proxy(url):
+        """Returns (proxy_host, proxy_headers) from the environment, or None."""
+        proxy_url = urllib.request.getproxies().get(url.scheme)
+        if not proxy_url or urllib.request.proxy_bypass(url.hostname or ''):
+            return None
+        if '://' not in proxy_url:
+            proxy_url = f'http://{proxy_url}'
+        proxy = urllib.parse.urlsplit(proxy_url)
+        headers = {}
+        if proxy.username:
+            credentials = f"{urllib.parse.unquote(proxy.username)}:{urllib.parse.unquote(proxy.password or '')}"
+            headers['Proxy-Authorization'] = 'Basic ' + base64.b64encode(credentials.encode()).decode('ascii')
+        return f"{proxy.hostname}:{proxy.port or 80}", headers
+
+    def _new_connection(self):
+        if not self._proxy:
+            if self._scheme == 'https':
+                return http.client.HTTPSConnection(self._host, timeout=self.timeout)
+            return http.client.HTTPConnection(self._host, timeout=self.timeout)
+
+        proxy_host, proxy_headers = self._proxy
+        if self._scheme == 'https':
+            conn = http.client.HTTPSConnection(proxy_host, timeout=self.timeout)
+            conn.set_tunnel(self._host, headers=proxy_headers)
+            return conn
+        return http.client.HTTPConnection(proxy_host, timeout=self.timeout)
+
+    def _checkout(self):
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            return self._new_connection()
+
+    def _checkin(self, conn):
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def _request(self, endpoint, params, method):
+        """Sends one request. Returns (status, headers, decoded_json_or_None)."""
+        headers = {
+            'Authorization': f'Bearer {self.token}',
+            'Accept-Encoding': 'gzip',
+        }
+        if self._proxy and self._scheme != 'https':
+            headers.update(self._proxy[1])
+        path = f"{self._path}{endpoint}"
+        body = None
+        if method == 'POST':
+            headers['Content-Type'] = 'application/json; charset=utf-8'
+            body = json.dumps(params or {}).encode('utf-8')
+        elif params:
+            path += '?' + urllib.parse.urlencode(params)
+
+        # A pooled connection may have been closed by the server while idle;
+        # retry once on a fresh connection before treating it as an error.
+        for fresh in (False, True):
+            conn = self._new_connection() if fresh else self._checkout()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+            except STALE_CONNECTION_ERRORS:
+                conn.close()
+                if fresh:
+                    raise
+                continue
+            except Exception:
+                conn.close()
+                raise
+            break
+
+        try:
+            data = None
+            if response.status == 200:
+                stream = response
+                if response.getheader('Content-Encoding', '').lower() == 'gzip':
+                    stream = gzip.GzipFile(fileobj=response)
+                data = json.load(stream)
+            # Drain whatever is left so the connection can be reused
+            response.read()
+        except Exception:
+            conn.close()
+            raise
+
+        if response.will_close:
+            conn.close()
+        else:
+            self._checkin(conn)
+        return response.status, response.headers, data
+
+    def call(self, endpoint, params=None, method='GET'):
+        """Calls a Slack API method with rate-limit handling. Returns the response dict or None."""
+        for attempt in range(MAX_RETRIES):
+            self.rate_limiter.acquire(endpoint)
+            try:
+                status, headers, response_data = self._request(endpoint, params, method)
+            except (OSError, http.client.HTTPException) as e:
+                print(f"  └─ URL Error for '{endpoint}': {e}", file=sys.stderr)
+                return None
+            except Exception as e:
+                print(f"  └─ Exception for '{endpoint}': {e}", file=sys.stderr)
+                return None
+
+            if status == 429:
+                # The 'Retry-After' header tells us how many seconds to wait
+                retry_after = int(headers.get('Retry-After', 60))
+                print(f"  🚦 Rate limited on attempt {attempt + 1}/{MAX_RETRIES}. Waiting for {retry_after} seconds before retrying...", file=sys.stderr)
+                # Slow this method's bucket down and hold back every worker using it
+                self.rate_limiter.on_rate_limited(endpoint, retry_after)
+                continue
+            if status != 200:
+                # For other HTTP errors, fail immediately
+                print(f"  └─ HTTP Error for '{endpoint}': {status} {http.client.responses.get(status, '')}", file=sys.stderr)
+                return None
+
+            if not response_data.get('ok'):
+                error = response_data.get('error', 'unknown_error')
+                # Don't retry on simple errors like 'not_in_channel'
+                print(f"  └─ API Error for '{endpoint}': {error}", file=sys.stderr)
+                return None
+
+            self.rate_limiter.on_success(endpoint)
+            return response_data
+
+        # If we've exhausted all retries
+        print(f"  └─ API call for '{endpoint}' failed after {MAX_RETRIES} retries.", file=sys.stderr)
+        return None
+
+    def paginate(self, endpoint, params, key):
+        """Yields the `key` list of each page of a cursor-paginated method.
+
+        Pages are fetched lazily, so a caller that stops iterating early saves
+        the remaining calls. Raises SlackAPIError if a page cannot be fetched.
+        """
+        params = dict(params)
+        while True:
+            response = self.call(endpoint, params)
+            if response is None:
+                raise SlackAPIError(f"Failed to fetch a page of '{endpoint}'")
+            yield response.get(key, [])
+
+            cursor = response.get('response_metadata', {}).get('next_cursor')
+            if not cursor:
+                return
+            params['cursor'] = cursor
+
+    def close(self):
+        """Closes every idle pooled connection."""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(token):
+    """Returns the process-wide client for `token`, creating it on first use."""
+    with _clients_lock:
+        if token not in _clients:
+            _clients[token] = SlackClient(token)
+        return _clients[token]
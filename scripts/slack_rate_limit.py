@@ -0,0 +1,141 @@
+"""
+Per-method adaptive rate limiting for the Slack Web API.
+
+Each Slack method gets its own token bucket sized to its documented rate
+tier. A bucket halves its rate once per 429 Retry-After window and creeps
+back towards the tier rate after a run of successful calls.
+
+Buckets are guarded by a plain lock and only ever hand out a wait time, so
+the same limiter can be shared by threads (`acquire`) and coroutines
+(`acquire_async`).
+
+See https://api.slack.com/docs/rate-limits
+"""
+
+import asyncio
+import os
+import threading
+import time
+
+# Calls per minute allowed by each Slack rate tier.
+TIER_RATES = {
+    1: 1,
+    2: 20,
+    3: 50,
+    4: 100,
+}
+
+# Documented tier for each method the scripts call.
+METHOD_TIERS = {
+    'conversations.list': 2,
+    'conversations.history': 3,
+    'conversations.members': 4,
+    'conversations.join': 3,
+    'users.lookupByEmail': 3,
+}
+DEFAULT_TIER = 2
+
+# Multiplies every tier rate. Only meant for a local stand-in server whose
+# limits are scaled the same way (see fake_slack.py).
+RATE_SCALE = float(os.environ.get('SLACK_RATE_SCALE', '1'))
+
+# A bucket never slows below this fraction of its tier rate.
+MIN_RATE_FRACTION = 0.125
+# Multiplicative decrease on 429, multiplicative increase on recovery.
+BACKOFF_FACTOR = 0.5
+RECOVERY_FACTOR = 1.25
+# Consecutive successes needed before a throttled bucket speeds up again.
+RECOVERY_AFTER = 20
+
+
+class TokenBucket:
+    """A thread-safe token bucket that tightens on 429s and loosens on success."""
+
+    def __init__(self, rate_per_minute, burst=None):
+        self.base_rate = rate_per_minute / 60.0
+        self.min_rate = self.base_rate * MIN_RATE_FRACTION
+        self.rate = self.base_rate
+        # Slack tolerates short bursts; allow roughly six seconds' worth.
+        self.capacity = burst if burst is not None else max(1.0, self.base_rate * 6)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._successes = 0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        if now > self._updated:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def reserve(self):
+        """Takes a token and returns how many seconds the caller must wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            # `_updated` is in the future while a Retry-After block is active
+            wait = max(0.0, self._updated - now)
+            if self._tokens < 0:
+                wait += -self._tokens / self.rate
+            return wait
+
+    def acquire(self):
+        """Blocks the calling thread until a call is allowed."""
+        time.sleep(self.reserve())
+
+    async def acquire_async(self):
+        """Suspends the calling coroutine until a call is allowed."""
+        await asyncio.sleep(self.reserve())
+
+    def on_success(self):
+        """Records a successful call, loosening the bucket after sustained success."""
+        with self._lock:
+            self._successes += 1
+            if self._successes >= RECOVERY_AFTER and self.rate < self.base_rate:
+                self.rate = min(self.base_rate, self.rate * RECOVERY_FACTOR)
+                self._successes = 0
+
+    def on_rate_limited(self, retry_after):
+        """Records a 429: slows the bucket and blocks it for `retry_after` seconds.
+
+        Calls already in flight when Slack starts throttling all come back as
+        429s; only the first one in a Retry-After window slows the bucket.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now >= self._updated:
+                self._refill(now)
+                self.rate = max(self.min_rate, self.rate * BACKOFF_FACTOR)
+            self._successes = 0
+            self._tokens = min(self._tokens, 0.0)
+            self._updated = max(self._updated, now + retry_after)
+
+
+class RateLimiter:
+    """A set of token buckets keyed by Slack method name."""
+
+    def __init__(self, method_tiers=None, rate_scale=RATE_SCALE):
+        self.method_tiers = dict(METHOD_TIERS if method_tiers is None else method_tiers)
+        self.rate_scale = rate_scale
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, method):
+        """Returns the bucket for `method`, creating it on first use."""
+        with self._lock:
+            if method not in self._buckets:
+                tier = self.method_tiers.get(method, DEFAULT_TIER)
+                self._buckets[method] = TokenBucket(TIER_RATES[tier] * self.rate_scale)
+            return self._buckets[method]
+
+    def acquire(self, method):
+        self.bucket(method).acquire()
+
+    async def acquire_async(self, method):
+        await self.bucket(method).acquire_async()
+
+    def on_success(self, method):
+        self.bucket(method).on_success()
+
+    def on_rate_limited(self, method, retry_after):
+        self.bucket(method).on_rate_limited(retry_after)
@@ -7,90 +7,273 @@
 
 Run from anywhere: ~/.claude/scripts/sync-repos.py
 Or add an alias: alias sync-repos='~/.claude/scripts/sync-repos.py'
+
+A thin front-end over workspace_sync.SyncPipeline. Clones and fetches run
+concurrently with separate limits (--clone-jobs, --pull-jobs), and local
+checkouts/fast-forwards run on their own pool. Clones are started
+largest-first by GitHub disk usage so the biggest repo is not the last one
+still downloading. Existing repos are only fetched if a `git ls-remote`
+shows their upstream has moved (--all to skip the check).
+
+The GitHub repo list is cached locally (see RepoInventory). A fresh cache is
+used as-is; a stale one is used to start syncing at once while `gh repo list`
+refreshes it in the background, and new or archived repos are reconciled
+when the refresh returns. Once the list has been fetched in this run, repos
+whose GitHub `pushedAt` is older than their last successful sync are skipped
+without touching the network.
 """
 
+import argparse
+import json
+import os
 import subprocess
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Callable, Iterator
 from rich.console import Console
 from rich.progress import Progress
 
+from workspace_sync import (
+    CLONED,
+    DEFAULT_CLONE_JOBS,
+    DEFAULT_FETCH_JOBS,
+    DEFAULT_LOCAL_JOBS,
+    UP_TO_DATE,
+    UPDATED,
+    RepoResult,
+    RepoSpec,
+    SyncPipeline,
+)
+
 console = Console()
 
 # Configuration
 ORG = "surgeventures"  # Change this to your GitHub org or username
 REPO_PREFIX = "app-"
 APPS_DIR = Path.home() / "_apps"
+INVENTORY_FILE = Path.home() / ".cache" / "sync-repos" / f"{ORG}.json"
+INVENTORY_TTL_MINUTES = 60
 
 
-def get_app_repos() -> list[str]:
+def get_app_repos() -> list[dict]:
     """Fetch all non-archived repos matching the prefix from GitHub."""
     result = subprocess.run(
         [
             "gh", "repo", "list", ORG, "--limit", "1000",
-            "--json", "name,isArchived",
-            "--jq", f'.[] | select(.name | startswith("{REPO_PREFIX}")) | select(.isArchived == false) | .name',
+            "--json", "name,isArchived,diskUsage,pushedAt",
+            "--jq", f'[.[] | select(.name | startswith("{REPO_PREFIX}")) | select(.isArchived == false)]',
         ],
         capture_output=True,
         text=True,
         check=True,
     )
-    return [name.strip() for name in result.stdout.strip().split("\n") if name.strip()]
-
-
-def sync_repo(repo_name: str) -> tuple[str, bool]:
-    """Clone or pull a single repo. Returns (status_message, success)."""
-    repo_path = APPS_DIR / repo_name
-    repo_url = f"{ORG}/{repo_name}"
-
-    if repo_path.exists():
-        try:
-            subprocess.run(
-                ["git", "-C", str(repo_path), "pull"],
-                capture_output=True,
-                text=True,
-                check=True,
-            )
-            return (f"✓ Updated {repo_name}", True)
-        except subprocess.CalledProcessError as e:
-            return (f"✗ Failed to update {repo_name}: {e.stderr}", False)
-    else:
-        try:
-            subprocess.run(
-                ["gh", "repo", "clone", repo_url, str(repo_path)],
-                capture_output=True,
-                text=True,
-                check=True,
-            )
-            return (f"✓ Cloned {repo_name}", True)
-        except subprocess.CalledProcessError as e:
-            return (f"✗ Failed to clone {repo_name}: {e.stderr}", False)
+    return json.loads(result.stdout or "[]")
+
+
+def repo_spec(repo: dict) -> RepoSpec:
+    name = repo["name"]
+    return RepoSpec(name, APPS_DIR / name, f"{ORG}/{name}", repo.get("diskUsage") or 0, repo.get("pushedAt"))
+
+
+def utc_now() -> str:
+    """Current time in GitHub's pushedAt format, so the two compare as strings."""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class RepoInventory:
+    """Local cache of the GitHub repo list plus each repo's last successful sync time."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.fetched_at = 0.0
+        self.repos: list[dict] = []
+        self.synced_at: dict[str, str] = {}
+        self.refreshed = False
+        if path.exists():
+            data = json.loads(path.read_text())
+            self.fetched_at = data.get("fetched_at", 0.0)
+            self.repos = data.get("repos", [])
+            self.synced_at = data.get("synced_at", {})
+
+    def is_fresh(self, ttl_minutes: float) -> bool:
+        return bool(self.repos) and time.time() - self.fetched_at < ttl_minutes * 60
+
+    def update(self, repos: list[dict]) -> None:
+        self.repos = repos
+        self.fetched_at = time.time()
+        self.refreshed = True
+        self.save()
+
+    def pushed_before_sync(self, spec: RepoSpec) -> bool:
+        """True if the spec's pushedAt is older than this repo's last successful sync."""
+        synced_at = self.synced_at.get(spec.name)
+        return bool(spec.path.exists() and spec.pushed_at and synced_at and spec.pushed_at < synced_at)
+
+    def unchanged_since_sync(self, spec: RepoSpec) -> bool:
+        """True if GitHub saw no push since this repo was last synced.
+
+        Only trusted once the list has been fetched during this run; a cached
+        pushedAt cannot rule out a push made after it was fetched.
+        """
+        return self.refreshed and self.pushed_before_sync(spec)
+
+    def mark_synced(self, names: list[str], when: str) -> None:
+        self.synced_at.update(dict.fromkeys(names, when))
+        self.save()
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps({
+            "fetched_at": self.fetched_at,
+            "repos": self.repos,
+            "synced_at": self.synced_at,
+        }))
+        os.replace(tmp_path, self.path)
+
+
+def clone_order(specs: list[RepoSpec]) -> list[RepoSpec]:
+    """Missing repos first, biggest first, so the longest download overlaps everything else."""
+    to_clone = sorted((s for s in specs if not s.path.exists()), key=lambda s: s.disk_usage_kb, reverse=True)
+    return to_clone + [s for s in specs if s.path.exists()]
+
+
+def discover_app_repos(
+    inventory: RepoInventory,
+    refresh: Future | None,
+    on_total: Callable[[int], None],
+) -> Iterator[RepoSpec]:
+    """Yield repos to sync from the cached inventory, reconciling with `refresh` if given.
+
+    With a stale inventory, repos whose cached pushedAt says "unchanged" are
+    held back until the refresh returns fresh pushedAt values (which the
+    pipeline's skip check can trust), while clones and repos known to have
+    changed start straight away.
+    """
+    cached = [repo_spec(r) for r in inventory.repos]
+    if refresh is None:
+        on_total(len(cached))
+        yield from clone_order(cached)
+        return
+
+    held = [s for s in cached if inventory.pushed_before_sync(s)]
+    held_names = {s.name for s in held}
+    started = [s for s in cached if s.name not in held_names]
+    total = len(started)
+    on_total(total)
+    yield from clone_order(started)
+
+    try:
+        latest = refresh.result()
+    except subprocess.CalledProcessError as e:
+        console.print(f"[yellow]Could not refresh repo list, using cached list: {e.stderr.strip()}[/yellow]")
+        # Without fresh pushedAt data, let the ls-remote check decide
+        for spec in held:
+            spec.pushed_at = None
+        on_total(total + len(held))
+        yield from held
+        return
+
+    inventory.update(latest)
+    latest_specs = {r["name"]: repo_spec(r) for r in latest}
+    cached_names = {s.name for s in cached}
+    for name in sorted(cached_names - latest_specs.keys()):
+        console.print(f"[yellow]{name} is archived or gone on GitHub; leaving local copy alone[/yellow]")
+
+    new = [s for name, s in latest_specs.items() if name not in cached_names]
+    for spec in new:
+        console.print(f"[cyan]New repo on GitHub: {spec.name}[/cyan]")
+    refreshed = [latest_specs[name] for name in held_names if name in latest_specs]
+    on_total(total + len(new) + len(refreshed))
+    yield from clone_order(new) + refreshed
+
+
+def format_result(result: RepoResult, was_clone: bool) -> str:
+    """Status line for a finished repo."""
+    name = result.spec.name
+    if result.status == CLONED:
+        return f"✓ Cloned {name}"
+    if result.status == UPDATED:
+        return f"✓ Updated {name}"
+    if result.status == UP_TO_DATE:
+        return f"✓ Up to date {name}" + (f" ({result.message})" if result.message else "")
+    return f"✗ Failed to {'clone' if was_clone else 'update'} {name}: {result.message}"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=f"Sync all {REPO_PREFIX}* repos from {ORG} to {APPS_DIR}")
+    parser.add_argument(
+        "--clone-jobs", type=int, default=DEFAULT_CLONE_JOBS,
+        help=f"number of concurrent clones (default: {DEFAULT_CLONE_JOBS})",
+    )
+    parser.add_argument(
+        "--pull-jobs", type=int, default=DEFAULT_FETCH_JOBS,
+        help=f"number of concurrent fetches (default: {DEFAULT_FETCH_JOBS})",
+    )
+    parser.add_argument(
+        "--local-jobs", type=int, default=DEFAULT_LOCAL_JOBS,
+        help=f"number of concurrent checkouts/fast-forwards (default: {DEFAULT_LOCAL_JOBS})",
+    )
+    parser.add_argument(
+        "--all", action="store_true",
+        help="fetch every existing repo without checking upstream or pushedAt first",
+    )
+    parser.add_argument(
+        "--refresh", action="store_true",
+        help="wait for a fresh repo list from GitHub instead of starting from the cache",
+    )
+    parser.add_argument(
+        "--inventory-ttl", type=float, default=INVENTORY_TTL_MINUTES,
+        help=f"minutes before the cached repo list is refreshed (default: {INVENTORY_TTL_MINUTES})",
+    )
+    return parser.parse_args()
 
 
 def main() -> None:
     """Sync all app-* repositories."""
-    console.print(f"[bold blue]Fetching {REPO_PREFIX}* repos from {ORG}...[/bold blue]")
+    args = parse_args()
+    run_started = utc_now()
+    inventory = RepoInventory(INVENTORY_FILE)
 
-    repos = get_app_repos()
+    with ThreadPoolExecutor(max_workers=1) as refresher:
+        refresh = None
+        if args.refresh or not inventory.repos:
+            console.print(f"[bold blue]Fetching {REPO_PREFIX}* repos from {ORG}...[/bold blue]")
+            inventory.update(get_app_repos())
+        elif not inventory.is_fresh(args.inventory_ttl):
+            console.print(f"[bold blue]Refreshing {REPO_PREFIX}* repos from {ORG} in the background...[/bold blue]")
+            refresh = refresher.submit(get_app_repos)
 
-    if not repos:
-        console.print(f"[yellow]No repos found matching '{REPO_PREFIX}*'[/yellow]")
-        return
+        if not inventory.repos:
+            console.print(f"[yellow]No repos found matching '{REPO_PREFIX}*'[/yellow]")
+            return
+
+        console.print(f"[green]Starting from {len(inventory.repos)} known repos[/green]\n")
 
-    console.print(f"[green]Found {len(repos)} repos[/green]\n")
+        pipeline = SyncPipeline(
+            clone_jobs=args.clone_jobs,
+            fetch_jobs=args.pull_jobs,
+            local_jobs=args.local_jobs,
+            check_upstream=not args.all,
+            skip=None if args.all else inventory.unchanged_since_sync,
+        )
 
-    success_count = 0
+        with Progress() as progress:
+            task = progress.add_task("[cyan]Syncing repos...", total=len(inventory.repos))
 
-    with Progress() as progress:
-        task = progress.add_task("[cyan]Syncing repos...", total=len(repos))
+            def on_result(result: RepoResult) -> None:
+                was_clone = result.status == CLONED or not result.spec.path.exists()
+                console.print(format_result(result, was_clone))
+                progress.advance(task)
 
-        for repo in repos:
-            message, success = sync_repo(repo)
-            console.print(message)
-            if success:
-                success_count += 1
-            progress.advance(task)
+            specs = discover_app_repos(inventory, refresh, lambda total: progress.update(task, total=total))
+            results = pipeline.run(specs, on_result)
 
-    console.print(f"\n[bold green]Done! {success_count}/{len(repos)} repos synced successfully[/bold green]")
+    synced = [r.spec.name for r in results if r.success]
+    inventory.mark_synced(synced, run_started)
+    console.print(f"\n[bold green]Done! {len(synced)}/{len(results)} repos synced successfully[/bold green]")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,19 @@
+from agent_metrics import print_report
+
+
+def session(files, tools):
+    return {"status": "done", "prompt": "verifier.md", "duration_ms": 10_000,
+            "total_cost_usd": 0.5, "files": files, "tools": tools}
+
+
+def test_open_calls_do_not_bias_mean_latency_and_empty_sessions_are_skipped(capsys):
+    runs = [
+        # Two Read calls finished in 300ms in total; a third never got a result
+        session(["a.py", "b.py"], {"Read": {"count": 3, "timed": 2, "total_ms": 300, "max_ms": 200}}),
+        session([], {"Read": {"count": 1, "timed": 1, "total_ms": 50, "max_ms": 50}}),
+    ]
+    print_report(runs)
+
+    out = capsys.readouterr().out
+    read_row = next(line for line in out.splitlines() if " Read " in line)
+    assert read_row.split()[2:] == ["3", "1.5", "150ms", "200ms"]
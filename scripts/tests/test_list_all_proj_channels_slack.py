@@ -0,0 +1,47 @@
+import time
+
+import list_all_proj_channels_slack as audit
+from audit_log import AuditLog
+from channel_state import ChannelStateStore, is_fresh
+
+
+def fake_api(responses):
+    def call(endpoint, token, params=None, method='GET'):
+        return responses[endpoint]
+    return call
+
+
+def test_joined_channel_is_fresh_on_the_next_run(tmp_path, monkeypatch):
+    monkeypatch.setattr(audit, 'slack_api_call', fake_api({
+        # Slack's join response does not always report the new size
+        'conversations.join': {'ok': True, 'channel': {'id': 'C1'}},
+        'conversations.history': {'ok': True, 'messages': [{'ts': f'{time.time():.6f}'}]},
+    }))
+    monkeypatch.setattr(audit, 'find_members', lambda token, channel_id, user_ids: {'U1'})
+    listed = {'id': 'C1', 'name': 'proj-a', 'is_member': False, 'num_members': 4, 'updated': 1}
+
+    record, _, state = audit.audit_channel('token', listed, {'a@example.com': 'U1'})
+    assert record['bot_is_member'] == "Yes"
+
+    store = ChannelStateStore(str(tmp_path / 'state.sqlite'))
+    channel, last_ts, member_ids = state
+    store.save(channel, last_ts, {'U1'}, member_ids)
+    entry = store.load()['C1']
+    store.close()
+
+    # What conversations.list reports once the bot has joined
+    relisted = {**listed, 'is_member': True, 'num_members': 5}
+    assert is_fresh(entry, relisted, {'U1'}, max_age_seconds=3600)
+
+
+def test_unresolved_email_is_not_reported_as_zero_memberships(tmp_path, capsys):
+    ndjson_file = str(tmp_path / 'run.ndjson')
+    with AuditLog(ndjson_file) as audit_log:
+        audit_log.append({'name': 'proj-a', 'channel_id': 'C1', 'user_is_member': "Yes",
+                          'is_dormant': "No", 'last_active': "1 days ago", 'members_count': 3,
+                          'user_membership': {'a@example.com': "Yes", 'nobody@example.com': "N/A"}})
+
+    audit.print_report(ndjson_file, {'a@example.com': 'U1', 'nobody@example.com': None})
+    out = capsys.readouterr().out
+    assert "member of 1/1 channels" in out
+    assert "nobody@example.com" in out and "0/1" not in out
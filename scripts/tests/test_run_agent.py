@@ -0,0 +1,137 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+sdk = pytest.importorskip("claude_agent_sdk")
+
+import run_agent  # noqa: E402
+
+
+def write_batch(batch_dir: Path, number: int, files: list[str]) -> Path:
+    path = batch_dir / f"batch_{number:02d}.json"
+    path.write_text(json.dumps({"batch": number, "files": files}))
+    return path
+
+
+def result_message(is_error: bool = False) -> "sdk.ResultMessage":
+    return sdk.ResultMessage(
+        subtype="error_during_execution" if is_error else "success",
+        duration_ms=10,
+        duration_api_ms=5,
+        is_error=is_error,
+        num_turns=1,
+        session_id="session-1",
+        total_cost_usd=0.01,
+    )
+
+
+def fake_query(failing: set[int]):
+    """A stand-in for `claude_agent_sdk.query` that records the batches it was asked to run."""
+    prompts = []
+
+    async def query(prompt, options):
+        prompts.append(prompt)
+        batch = int(prompt.split()[2])
+        yield sdk.SystemMessage(subtype="init", data={"session_id": f"session-{batch}"})
+        yield result_message(is_error=batch in failing)
+
+    return query, prompts
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "prompt.md").write_text("Verify the files.")
+    batch_dir = tmp_path / ".github" / "unowned-batches"
+    batch_dir.mkdir(parents=True)
+    src = tmp_path / "src"
+    src.mkdir()
+    for i in range(60):
+        (src / f"f{i}.py").write_text("x = 1\n" * 100)
+    return batch_dir
+
+
+def statuses(outcomes):
+    return [(o.batch, o.status) for o in outcomes]
+
+
+def test_failed_session_gets_no_result_and_is_retried(workspace):
+    files = [write_batch(workspace, n, [f"src/f{n}.py"]) for n in (1, 2)]
+
+    query, _ = fake_query(failing={1, 2})
+    outcomes = asyncio.run(run_agent.run_many("prompt.md", files, query_fn=query))
+    assert statuses(outcomes) == [(1, "failed"), (2, "failed")]
+    assert not run_agent.result_path(1).exists()
+
+    query, prompts = fake_query(failing=set())
+    outcomes = asyncio.run(run_agent.run_many("prompt.md", files, query_fn=query))
+    assert statuses(outcomes) == [(1, "done"), (2, "done")]
+    assert len(prompts) == 2
+    assert run_agent.result_path(1).exists()
+
+    outcomes = asyncio.run(run_agent.run_many("prompt.md", files, query_fn=query))
+    assert statuses(outcomes) == [(1, "skipped"), (2, "skipped")]
+
+
+def test_failed_rerun_with_force_drops_the_old_result(workspace):
+    files = [write_batch(workspace, 1, ["src/f1.py"]), write_batch(workspace, 2, ["src/f2.py"])]
+    query, _ = fake_query(failing=set())
+    asyncio.run(run_agent.run_many("prompt.md", files, query_fn=query))
+
+    query, _ = fake_query(failing={1})
+    outcomes = asyncio.run(run_agent.run_many("prompt.md", files, force=True, query_fn=query))
+    assert statuses(outcomes) == [(1, "failed"), (2, "done")]
+    assert not run_agent.result_path(1).exists()
+
+
+def test_reshard_splits_only_the_failed_batch(workspace):
+    finished = write_batch(workspace, 1, [f"src/f{i}.py" for i in range(50)])
+    failing = write_batch(workspace, 2, [f"src/f{i}.py" for i in range(50, 60)])
+    run_agent.OUTPUT_DIR.mkdir(parents=True)
+    run_agent.result_path(1).write_text("{}")
+
+    query, prompts = fake_query(failing={2})
+    outcomes = asyncio.run(run_agent.run_with_resharding("prompt.md", [finished, failing], query_fn=query))
+
+    assert finished.exists()
+    assert not failing.exists()
+    assert statuses(outcomes) == [(1, "skipped"), (3, "done"), (4, "done")]
+    assert [prompt.split()[2] for prompt in prompts] == ["2", "3", "4"]
+
+
+def test_resharded_batches_are_not_resolved(workspace):
+    kept = write_batch(workspace, 3, ["src/f3.py"])
+    replaced = write_batch(workspace, 2, ["src/f2.py"])
+    replaced.rename(replaced.with_name(replaced.name + ".resharded"))
+
+    assert run_agent.resolve_batch_files([str(workspace)]) == [kept.resolve()]
+    assert run_agent.resolve_batch_files([str(workspace / "batch_*")]) == [kept.resolve()]
+    assert run_agent.resolve_batch_files([str(workspace / "batch_02.json.resharded")]) == []
+
+
+def test_failed_rerun_keeps_the_old_result_without_force(workspace):
+    batch_file = write_batch(workspace, 1, ["src/f1.py"])
+    query, _ = fake_query(failing=set())
+    asyncio.run(run_agent.run("prompt.md", str(batch_file), query_fn=query))
+
+    query, _ = fake_query(failing={1})
+    outcome = asyncio.run(run_agent.run("prompt.md", str(batch_file), query_fn=query))
+    assert outcome.status == "failed"
+    assert run_agent.result_path(1).exists()
+
+
+def test_directory_with_one_finished_batch_is_skipped(workspace, monkeypatch):
+    write_batch(workspace, 1, ["src/f1.py"])
+    run_agent.OUTPUT_DIR.mkdir(parents=True)
+    run_agent.result_path(1).write_text("{}")
+
+    async def must_not_run(*args, **kwargs):
+        raise AssertionError("a finished batch was re-run")
+
+    monkeypatch.setattr(run_agent, "run", must_not_run)
+    for pattern in (str(workspace), str(workspace / "batch_*.json")):
+        monkeypatch.setattr("sys.argv", ["run_agent.py", "prompt.md", pattern])
+        run_agent.main()
+    assert run_agent.result_path(1).read_text() == "{}"
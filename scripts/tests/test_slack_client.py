@@ -0,0 +1,80 @@
+import time
+
+import pytest
+
+import fake_slack
+from fake_slack import FakeSlackServer, Workspace
+from slack_client import SlackClient
+
+
+class RecordingLimiter:
+    """Stands in for the shared RateLimiter without ever sleeping."""
+
+    def __init__(self):
+        self.rate_limited = []
+
+    def acquire(self, method):
+        pass
+
+    def on_success(self, method):
+        pass
+
+    def on_rate_limited(self, method, retry_after):
+        self.rate_limited.append((method, retry_after))
+
+
+def serve(**kwargs):
+    server = FakeSlackServer(Workspace(300), rate_scale=1000, **kwargs).start()
+    limiter = RecordingLimiter()
+    client = SlackClient('xoxb-fake', base_url=server.url, rate_limiter=limiter)
+    connections = []
+    new_connection = client._new_connection
+
+    def counting_new_connection():
+        connections.append(new_connection())
+        return connections[-1]
+
+    client._new_connection = counting_new_connection
+    return server, client, limiter, connections
+
+
+@pytest.fixture
+def slack():
+    server, client, limiter, connections = serve()
+    yield server, client, limiter, connections
+    client.close()
+    server.stop()
+
+
+def test_gzipped_pages_decode_over_one_pooled_connection(slack):
+    _, client, _, connections = slack
+    pages = list(client.paginate('conversations.list', {'types': 'public_channel,private_channel', 'limit': 100}, 'channels'))
+
+    # Each page is well over the server's gzip threshold
+    assert [len(page) for page in pages] == [100, 100, 100]
+    assert len(connections) == 1
+
+
+def test_stale_pooled_connection_is_retried_on_a_fresh_one(slack, monkeypatch):
+    _, client, _, connections = slack
+    # The server drops keep-alive connections that sit idle
+    monkeypatch.setattr(fake_slack.FakeSlackHandler, 'timeout', 0.1)
+    assert client.call('users.lookupByEmail', {'email': 'user1@example.com'})['user']['id'] == 'U00000001'
+    time.sleep(0.3)
+
+    assert client.call('users.lookupByEmail', {'email': 'user2@example.com'})['user']['id'] == 'U00000002'
+    assert len(connections) == 2
+
+
+def test_429_is_retried_after_backing_off():
+    server, client, limiter, _ = serve(throttle_every=2)
+    try:
+        client.call('users.lookupByEmail', {'email': 'user1@example.com'})
+        response = client.call('users.lookupByEmail', {'email': 'user2@example.com'})
+    finally:
+        client.close()
+        server.stop()
+
+    assert response['user']['id'] == 'U00000002'
+    assert limiter.rate_limited == [('users.lookupByEmail', 1)]
+    assert server.stats['rate_limited']['users.lookupByEmail'] == 1
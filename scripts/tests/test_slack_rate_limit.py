@@ -0,0 +1,25 @@
+from slack_rate_limit import BACKOFF_FACTOR, TokenBucket
+
+
+def test_a_burst_of_429s_backs_off_once(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('slack_rate_limit.time.monotonic', lambda: now[0])
+    bucket = TokenBucket(50)
+
+    # Every call in flight when Slack starts throttling comes back as a 429
+    for _ in range(4):
+        bucket.on_rate_limited(retry_after=2)
+    assert bucket.rate == bucket.base_rate * BACKOFF_FACTOR
+
+    # A 429 after the Retry-After window is a new event
+    now[0] += 2
+    bucket.on_rate_limited(retry_after=2)
+    assert bucket.rate == bucket.base_rate * BACKOFF_FACTOR ** 2
+
+
+def test_rate_limited_bucket_blocks_for_retry_after(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('slack_rate_limit.time.monotonic', lambda: now[0])
+    bucket = TokenBucket(60)
+    bucket.on_rate_limited(retry_after=3)
+    assert bucket.reserve() >= 3
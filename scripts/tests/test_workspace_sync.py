@@ -0,0 +1,99 @@
+import os
+import subprocess
+
+import pytest
+
+from workspace_sync import (
+    FAILED,
+    UP_TO_DATE,
+    UPDATED,
+    RepoSpec,
+    SyncPipeline,
+    upstream_changed,
+)
+
+
+def git(cwd, *args):
+    return subprocess.run(
+        ["git", "-C", str(cwd), *args], check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+def commit(repo, message):
+    (repo / "file.txt").write_text(message)
+    git(repo, "add", "file.txt")
+    git(repo, "commit", "--quiet", "-m", message)
+    return git(repo, "rev-parse", "HEAD")
+
+
+@pytest.fixture
+def remote(tmp_path, monkeypatch):
+    """A bare remote on `main` with one commit, and a second clone to push from."""
+    monkeypatch.setenv("GIT_CONFIG_GLOBAL", os.devnull)
+    monkeypatch.setenv("GIT_CONFIG_NOSYSTEM", "1")
+    for who in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{who}_NAME", "Test")
+        monkeypatch.setenv(f"GIT_{who}_EMAIL", "test@example.com")
+
+    bare = tmp_path / "remote.git"
+    git(tmp_path, "init", "--quiet", "--bare", str(bare))
+    git(bare, "symbolic-ref", "HEAD", "refs/heads/main")
+
+    pusher = tmp_path / "pusher"
+    git(tmp_path, "init", "--quiet", str(pusher))
+    git(pusher, "checkout", "--quiet", "-b", "main")
+    commit(pusher, "initial")
+    git(pusher, "remote", "add", "origin", str(bare))
+    git(pusher, "push", "--quiet", "-u", "origin", "main")
+    return bare, pusher
+
+
+@pytest.fixture
+def clone(tmp_path, remote):
+    bare, _ = remote
+    path = tmp_path / "clone"
+    git(tmp_path, "clone", "--quiet", str(bare), str(path))
+    return path
+
+
+def sync(path):
+    results = SyncPipeline(fetch_jobs=1, local_jobs=1).run([RepoSpec(path.name, path)], lambda _: None)
+    assert len(results) == 1
+    return results[0]
+
+
+def test_upstream_unchanged(clone):
+    assert not upstream_changed(clone)
+    assert sync(clone).status == UP_TO_DATE
+
+
+def test_upstream_moved(remote, clone):
+    _, pusher = remote
+    head = commit(pusher, "second")
+    git(pusher, "push", "--quiet")
+
+    assert upstream_changed(clone)
+    assert sync(clone).status == UPDATED
+    assert git(clone, "rev-parse", "HEAD") == head
+
+
+def test_head_behind_fetched_tracking_ref(remote, clone):
+    _, pusher = remote
+    head = commit(pusher, "second")
+    git(pusher, "push", "--quiet")
+    # The tracking ref already matches the remote, but HEAD was never merged
+    git(clone, "fetch", "--quiet")
+
+    assert upstream_changed(clone)
+    assert sync(clone).status == UPDATED
+    assert git(clone, "rev-parse", "HEAD") == head
+
+
+def test_no_upstream(clone):
+    git(clone, "branch", "--quiet", "--unset-upstream")
+
+    assert upstream_changed(clone)
+    # Goes through a normal fetch and reports the missing upstream there
+    result = sync(clone)
+    assert result.status == FAILED
+    assert "upstream" in result.message
@@ -0,0 +1,246 @@
+"""Shared sync engine for the ~/_apps workspace.
+
+`pull_all.py` and `sync_repos.py` are thin front-ends over `SyncPipeline`,
+which moves each repo through three stages, each with its own worker pool:
+
+1. Discovery: the front-end yields `RepoSpec`s (local glob or `gh repo list`);
+   it runs on its own thread, so repos are dispatched as they are found.
+2. Network: clone missing repos, or check the upstream with one lightweight
+   `git ls-remote` and fetch only if it moved.
+3. Local: check out fresh clones or fast-forward fetched repos.
+
+Network-bound fetches and clones overlap with the CPU/disk-bound local work,
+and each repo produces one `RepoResult` for the front-end to render.
+"""
+
+import os
+import queue
+import subprocess
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+DEFAULT_CLONE_JOBS = 4
+DEFAULT_FETCH_JOBS = 8
+DEFAULT_LOCAL_JOBS = os.cpu_count() or 4
+
+# Seconds the dispatcher waits for stage results before checking for new repos.
+POLL_INTERVAL = 0.05
+
+CLONED = "cloned"
+UPDATED = "updated"
+UP_TO_DATE = "up to date"
+FAILED = "failed"
+MISSING = "missing"
+
+
+@dataclass
+class RepoSpec:
+    name: str
+    path: Path
+    # `gh repo clone` source (e.g. "org/name"); None means only update existing clones
+    clone_source: str | None = None
+    disk_usage_kb: int = 0
+    # Last push time reported by GitHub (ISO 8601, UTC), if known
+    pushed_at: str | None = None
+
+
+@dataclass
+class RepoResult:
+    spec: RepoSpec
+    status: str
+    message: str = ""
+
+    @property
+    def success(self) -> bool:
+        return self.status in (CLONED, UPDATED, UP_TO_DATE)
+
+
+def _git(repo_path: Path, *args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        ["git", "-C", str(repo_path), *args],
+        capture_output=True,
+        text=True,
+    )
+
+
+def _output(result: subprocess.CompletedProcess) -> str:
+    return result.stdout.strip() or result.stderr.strip()
+
+
+# --- Discovery ---
+
+def discover_local_repos(base_path: Path) -> Iterator[RepoSpec]:
+    """Yield a spec for every directory under `base_path` containing a .git folder."""
+    for git_dir in sorted(base_path.glob("*/.git")):
+        if git_dir.is_dir():
+            yield RepoSpec(git_dir.parent.name, git_dir.parent)
+
+
+# --- Network stage ---
+
+def upstream_changed(repo_path: Path) -> bool:
+    """Return True if a pull could bring anything in.
+
+    Compares the upstream branch SHA from `git ls-remote` with the local
+    tracking ref. Any failure (detached HEAD, no upstream, unreachable remote)
+    also returns True, so the repo goes through a normal fetch and reports its
+    error there.
+    """
+    head_ref = _git(repo_path, "symbolic-ref", "-q", "HEAD").stdout.strip()
+    if not head_ref:
+        return True
+
+    upstream = _git(
+        repo_path, "for-each-ref",
+        "--format=%(upstream:remotename)%09%(upstream:remoteref)%09%(upstream)",
+        head_ref,
+    ).stdout.strip().split("\t")
+    if len(upstream) != 3 or not all(upstream):
+        return True
+    remote, remote_ref, tracking_ref = upstream
+
+    # Local HEAD is behind a tracking ref that was already fetched
+    if _git(repo_path, "merge-base", "--is-ancestor", tracking_ref, "HEAD").returncode != 0:
+        return True
+
+    tracking_sha = _git(repo_path, "rev-parse", tracking_ref).stdout.strip()
+    ls_remote = _git(repo_path, "ls-remote", "--exit-code", remote, remote_ref)
+    if ls_remote.returncode != 0:
+        return True
+    remote_sha = ls_remote.stdout.split("\t", 1)[0].strip()
+    return remote_sha != tracking_sha
+
+
+def clone_repo(spec: RepoSpec) -> RepoResult | None:
+    """Clone without a checkout; the local stage populates the worktree."""
+    result = subprocess.run(
+        ["gh", "repo", "clone", spec.clone_source, str(spec.path), "--", "--no-checkout"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        return RepoResult(spec, FAILED, _output(result))
+    return None
+
+
+def fetch_repo(spec: RepoSpec, check_upstream: bool) -> RepoResult | None:
+    """Fetch if the upstream moved. Returns a final result, or None to fast-forward next."""
+    if check_upstream and not upstream_changed(spec.path):
+        return RepoResult(spec, UP_TO_DATE)
+    result = _git(spec.path, "fetch", "--quiet")
+    if result.returncode != 0:
+        return RepoResult(spec, FAILED, _output(result))
+    return None
+
+
+# --- Local stage ---
+
+def checkout_clone(spec: RepoSpec) -> RepoResult:
+    result = _git(spec.path, "checkout", "--quiet", "--force", "HEAD")
+    if result.returncode != 0:
+        return RepoResult(spec, FAILED, _output(result))
+    return RepoResult(spec, CLONED)
+
+
+def fast_forward(spec: RepoSpec) -> RepoResult:
+    result = _git(spec.path, "merge", "--ff-only", "@{upstream}")
+    output = _output(result)
+    if result.returncode != 0:
+        return RepoResult(spec, FAILED, output)
+    if "Already up to date" in output:
+        return RepoResult(spec, UP_TO_DATE)
+    return RepoResult(spec, UPDATED, output)
+
+
+class SyncPipeline:
+    """Runs repos through the discovery, network and local stages on separate worker pools."""
+
+    def __init__(
+        self,
+        clone_jobs: int = DEFAULT_CLONE_JOBS,
+        fetch_jobs: int = DEFAULT_FETCH_JOBS,
+        local_jobs: int = DEFAULT_LOCAL_JOBS,
+        check_upstream: bool = True,
+        skip: Callable[[RepoSpec], bool] | None = None,
+    ):
+        self.clone_jobs = max(1, clone_jobs)
+        self.fetch_jobs = max(1, fetch_jobs)
+        self.local_jobs = max(1, local_jobs)
+        self.check_upstream = check_upstream
+        # Repos for which `skip(spec)` is true are reported up to date without any git work
+        self.skip = skip
+
+    def run(
+        self,
+        specs: Iterable[RepoSpec],
+        on_result: Callable[[RepoResult], None],
+    ) -> list[RepoResult]:
+        """Sync every repo in `specs`, in the order given within each pool.
+
+        `specs` is consumed on a discovery thread, so a slow or blocking
+        iterator does not hold up repos it has already produced. `on_result`
+        is called from the calling thread as each repo finishes, so it can
+        safely drive a `rich` display.
+        """
+        results = []
+        discovered = queue.Queue()
+
+        def discover() -> None:
+            try:
+                for spec in specs:
+                    discovered.put(spec)
+            finally:
+                discovered.put(None)
+
+        def finish(result: RepoResult) -> None:
+            results.append(result)
+            on_result(result)
+
+        with (
+            ThreadPoolExecutor(max_workers=1) as discovery_pool,
+            ThreadPoolExecutor(max_workers=self.clone_jobs) as clone_pool,
+            ThreadPoolExecutor(max_workers=self.fetch_jobs) as fetch_pool,
+            ThreadPoolExecutor(max_workers=self.local_jobs) as local_pool,
+        ):
+            discovery = discovery_pool.submit(discover)
+            discovering = True
+            # future -> (spec, local stage to run if the network stage returns None)
+            pending = {}
+
+            while discovering or pending:
+                while True:
+                    try:
+                        spec = discovered.get(timeout=0 if pending else POLL_INTERVAL)
+                    except queue.Empty:
+                        break
+                    if spec is None:
+                        discovering = False
+                        break
+                    if self.skip and self.skip(spec):
+                        finish(RepoResult(spec, UP_TO_DATE, "not pushed since last sync"))
+                    elif spec.path.exists():
+                        future = fetch_pool.submit(fetch_repo, spec, self.check_upstream)
+                        pending[future] = (spec, fast_forward)
+                    elif spec.clone_source:
+                        future = clone_pool.submit(clone_repo, spec)
+                        pending[future] = (spec, checkout_clone)
+                    else:
+                        finish(RepoResult(spec, MISSING, f"{spec.path} does not exist"))
+
+                if not pending:
+                    continue
+                done, _ = wait(pending, timeout=POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                for future in done:
+                    spec, local_stage = pending.pop(future)
+                    result = future.result()
+                    if result is None and local_stage:
+                        pending[local_pool.submit(local_stage, spec)] = (spec, None)
+                    else:
+                        finish(result)
+
+            # Surface any error raised while discovering
+            discovery.result()
+
+        return results
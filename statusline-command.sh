@@ -1,18 +1,136 @@
 #!/bin/bash
 
+# Renders from a cache so that a typical render forks nothing but `date`.
+#
+# Git info is cached per repo and recomputed (with a single `git status`)
+# when .git/index, HEAD, the HEAD reflog, FETCH_HEAD, packed-refs or the stash
+# change, or after STATUSLINE_GIT_TTL seconds, since editing a tracked file
+# does not touch the index. With STATUSLINE_REFRESH=background a stale cache
+# is shown while a background process refreshes it.
+#
+# Language version probes (e.g. `elixir --version`, which boots the BEAM) are
+# memoized per directory, keyed by PATH and the .tool-versions contents.
+
 # Use --no-optional-locks to prevent index.lock issues
 GIT="git --no-optional-locks"
 
+CACHE_DIR="${XDG_CACHE_HOME:-$HOME/.cache}/claude-statusline"
+GIT_TTL="${STATUSLINE_GIT_TTL:-5}"
+LANG_TTL="${STATUSLINE_LANG_TTL:-3600}"
+REFRESH_MODE="${STATUSLINE_REFRESH:-sync}"
+
+read -r now time_hm < <(date '+%s %H:%M')
+
+# Find the git root and git dirs without forking git (handles worktrees)
+git_root=""
+git_dir=""
+common_dir=""
+find_git() {
+    local dir="$PWD" line
+    while true; do
+        if [ -d "$dir/.git" ]; then
+            git_dir="$dir/.git"
+        elif [ -f "$dir/.git" ]; then
+            read -r line < "$dir/.git"
+            git_dir="${line#gitdir: }"
+            [[ "$git_dir" != /* ]] && git_dir="$dir/$git_dir"
+        fi
+        if [ -n "$git_dir" ]; then
+            git_root="${dir:-/}"
+            break
+        fi
+        [ -z "$dir" ] && return 1
+        dir="${dir%/*}"
+    done
+
+    common_dir="$git_dir"
+    if [ -f "$git_dir/commondir" ]; then
+        read -r line < "$git_dir/commondir"
+        if [[ "$line" = /* ]]; then common_dir="$line"; else common_dir="$git_dir/$line"; fi
+    fi
+}
+
+# True if none of the files git state depends on changed since the cache was written
+git_cache_valid() {
+    local f
+    [ -f "$git_cache" ] || return 1
+    for f in "$git_dir/index" "$git_dir/HEAD" "$git_dir/logs/HEAD" \
+             "$common_dir/FETCH_HEAD" "$common_dir/packed-refs" "$common_dir/logs/refs/stash"; do
+        if [ -e "$f" ] && ! [ "$git_cache" -nt "$f" ]; then
+            return 1
+        fi
+    done
+    return 0
+}
+
+refresh_git() {
+    local line branch="" uncommitted=0 ahead=0 behind=0 stash=0
+    # One status call gives the branch, ahead/behind and changed files
+    while IFS= read -r line; do
+        case "$line" in
+            "# branch.head "*)
+                branch="${line#\# branch.head }"
+                [ "$branch" = "(detached)" ] && branch=""
+                ;;
+            "# branch.ab "*)
+                set -- ${line#\# branch.ab }
+                ahead="${1#+}"
+                behind="${2#-}"
+                ;;
+            "# "*) ;;
+            *) uncommitted=$((uncommitted + 1)) ;;
+        esac
+    done < <($GIT -C "$git_root" status --porcelain=v2 --branch 2>/dev/null)
+
+    # Each stash entry is one line of the stash reflog
+    if [ -f "$common_dir/logs/refs/stash" ]; then
+        while IFS= read -r line; do
+            stash=$((stash + 1))
+        done < "$common_dir/logs/refs/stash"
+    fi
+
+    mkdir -p "$CACHE_DIR"
+    printf '%s\n' "$now" "$branch" "$uncommitted" "$ahead" "$behind" "$stash" > "$git_cache.$$"
+    mv -f "$git_cache.$$" "$git_cache"
+}
+
+refresh_git_in_background() {
+    local lock="$git_cache.lock"
+    # Clear a lock left behind by a refresher that was killed
+    [ -d "$lock" ] && [ -n "$(find "$lock" -maxdepth 0 -mmin +1 2>/dev/null)" ] && rmdir "$lock"
+    mkdir "$lock" 2>/dev/null || return
+    ( refresh_git; rmdir "$lock" ) </dev/null >/dev/null 2>&1 &
+}
+
+branch=""
+uncommitted=0
+ahead=0
+behind=0
+stash_count=0
+
+if find_git; then
+    git_cache="$CACHE_DIR/git${git_root//\//%}"
+    cached_at=0
+    [ -f "$git_cache" ] && read -r cached_at < "$git_cache"
+
+    if ! git_cache_valid || [ $((now - cached_at)) -ge "$GIT_TTL" ]; then
+        if [ "$REFRESH_MODE" = "background" ] && [ -f "$git_cache" ]; then
+            refresh_git_in_background
+        else
+            refresh_git
+        fi
+    fi
+    { read -r _; read -r branch; read -r uncommitted; read -r ahead; read -r behind; read -r stash_count; } < "$git_cache"
+fi
+
 # Git branch
-branch=$($GIT branch --show-current 2>/dev/null)
 if [ -z "$branch" ]; then
     branch_display="🚫 no git"
 else
     branch_display="🌿 $branch"
 fi
 
-# Uncommitted files count (with --no-optional-locks to prevent locking)
-uncommitted=$($GIT status --porcelain 2>/dev/null | wc -l | tr -d ' ')
+# Uncommitted files count
 if [ "$uncommitted" -eq 0 ]; then
     uncommitted_display="✨ clean"
 else
@@ -20,19 +138,17 @@ else
 fi
 
 # Project directory (git root) and current location
-git_root=$($GIT rev-parse --show-toplevel 2>/dev/null)
-
 if [ -n "$git_root" ]; then
-    project=$(basename "$git_root")
+    project="${git_root##*/}"
     if [ "$PWD" != "$git_root" ]; then
-        subdir=$(echo "$PWD" | sed "s|$git_root/||")
+        subdir="${PWD#"$git_root"/}"
         dir_display="📁 $project/$subdir"
     else
         dir_display="📁 $project"
     fi
 else
     # Not in a git repo - show current directory
-    dir_display="📁 $(basename "$PWD")"
+    dir_display="📁 ${PWD##*/}"
 fi
 
 # Model
@@ -40,20 +156,15 @@ model="${CLAUDE_MODEL:-opus}"
 
 # Ahead/behind remote
 ahead_behind=""
-if $GIT rev-parse --abbrev-ref @{upstream} &>/dev/null; then
-    ahead=$($GIT rev-list --count @{upstream}..HEAD 2>/dev/null || echo 0)
-    behind=$($GIT rev-list --count HEAD..@{upstream} 2>/dev/null || echo 0)
-    [ "$ahead" -gt 0 ] && ahead_behind="⬆$ahead "
-    [ "$behind" -gt 0 ] && ahead_behind="${ahead_behind}⬇$behind"
-fi
+[ "$ahead" -gt 0 ] && ahead_behind="⬆$ahead "
+[ "$behind" -gt 0 ] && ahead_behind="${ahead_behind}⬇$behind"
 
 # Stash count
-stash_count=$($GIT stash list 2>/dev/null | wc -l | tr -d ' ')
 stash_display=""
 [ "$stash_count" -gt 0 ] && stash_display="📦 $stash_count stashed"
 
 # Time
-time_display="🕐 $(date +%H:%M)"
+time_display="🕐 $time_hm"
 
 # Language version detection with mismatch support
 check_dir="${git_root:-$PWD}"
@@ -66,14 +177,20 @@ has_file() {
 
 # Get wanted version from .tool-versions (short: e.g., "1.16" from "1.16.2-otp-26")
 get_wanted() {
-    local tool="$1"
-    grep "^$tool " "$check_dir/.tool-versions" 2>/dev/null | awk '{print $2}' | grep -oE '^[0-9]+\.[0-9]+'
+    local tool="$1" name version rest
+    wanted=""
+    [ -f "$check_dir/.tool-versions" ] || return
+    while read -r name version rest; do
+        if [ "$name" = "$tool" ]; then
+            [[ "$version" =~ ^([0-9]+\.[0-9]+) ]] && wanted="${BASH_REMATCH[1]}"
+            return
+        fi
+    done < "$check_dir/.tool-versions"
 }
 
-# Get active version (short), returns empty if tool not available
-get_active() {
-    local tool="$1"
-    case "$tool" in
+# Get active version (short), empty if tool not available
+probe_active() {
+    case "$1" in
         elixir) elixir --version 2>/dev/null | grep -oE 'Elixir [0-9]+\.[0-9]+' | cut -d' ' -f2 ;;
         python) python3 --version 2>/dev/null | grep -oE '[0-9]+\.[0-9]+' | head -1 ;;
         ruby)   ruby --version 2>/dev/null | grep -oE '[0-9]+\.[0-9]+' | head -1 ;;
@@ -82,37 +199,59 @@ get_active() {
     esac
 }
 
+# Memoized probe_active: reused while PATH and .tool-versions are unchanged
+get_active() {
+    local tool="$1" cache="$CACHE_DIR/lang-$1${check_dir//\//%}"
+    local key local_versions="" global_versions="" stamp value stored
+    [ -f "$check_dir/.tool-versions" ] && IFS= read -r -d '' local_versions < "$check_dir/.tool-versions"
+    [ -f "$HOME/.tool-versions" ] && IFS= read -r -d '' global_versions < "$HOME/.tool-versions"
+    key="$PATH"$'\n'"$local_versions"$'\n'"$global_versions"
+
+    if [ -f "$cache" ]; then
+        { IFS= read -r stamp; IFS= read -r value; IFS= read -r -d '' stored; } < "$cache"
+        if [ "$stored" = "$key" ] && [ $((now - stamp)) -lt "$LANG_TTL" ]; then
+            active="$value"
+            return
+        fi
+    fi
+
+    active=$(probe_active "$tool")
+    mkdir -p "$CACHE_DIR"
+    printf '%s\n%s\n%s' "$now" "$active" "$key" > "$cache.$$"
+    mv -f "$cache.$$" "$cache"
+}
+
 # Format version display: match=version, mismatch=want→have, missing=want ✗
 format_version() {
     local icon="$1" tool="$2"
-    local wanted=$(get_wanted "$tool")
-    local active=$(get_active "$tool")
+    get_wanted "$tool"
+    get_active "$tool"
 
     if [ -n "$wanted" ]; then
         if [ -n "$active" ]; then
             if [ "$wanted" = "$active" ]; then
-                echo "$icon $active"
+                lang_display="$icon $active"
             else
-                echo "$icon $wanted→$active"
+                lang_display="$icon $wanted→$active"
             fi
         else
-            echo "$icon $wanted ✗"
+            lang_display="$icon $wanted ✗"
         fi
     elif [ -n "$active" ]; then
-        echo "$icon $active"
+        lang_display="$icon $active"
     fi
 }
 
 if has_file "mix.exs" || has_file "mix.lock"; then
-    lang_display=$(format_version "💧" "elixir")
+    format_version "💧" "elixir"
 elif has_file "pyproject.toml" || has_file "requirements.txt" || has_file "setup.py"; then
-    lang_display=$(format_version "🐍" "python")
+    format_version "🐍" "python"
 elif has_file "Gemfile" || has_file ".ruby-version"; then
-    lang_display=$(format_version "💎" "ruby")
+    format_version "💎" "ruby"
 elif has_file "package.json"; then
-    lang_display=$(format_version "⬢" "nodejs")
+    format_version "⬢" "nodejs"
 elif has_file "go.mod"; then
-    lang_display=$(format_version "🐹" "golang")
+    format_version "🐹" "golang"
 fi
 
 # Build output - only include ahead_behind and stash if they have values